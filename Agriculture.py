@@ -1,14 +1,25 @@
-import pandas as pd
+import time
 import numpy as np
 import random
-from datetime import datetime, timedelta
 
-# Number of rows
-num_rows = 100000
+from buffers import CATEGORY, RecordBuffer
+from common import CHUNK_SIZE, bind_batch_options, build_parser, output_options, stream_chunks
+from dates import (CROP_SEASONS, TIME_PERIODS, get_calendar, month_to_crop_season, random_date_in_year,
+                   time_period_codes)
+import profiling
+from runner import run_sector
+from sampling import GroupedChoice, location_choice
+
+SECTOR = "agriculture"
+
+# Default number of rows (--rows)
+NUM_ROWS = 100000
 
 # Year range
 years = list(range(2014, 2026))
-time_period_map = {year: "Past" if year < 2019 else "Present" for year in years}
+
+def get_time_period(year):
+    return "Past" if year < 2019 else "Present"
 
 # Regions & Districts
 regions = ["Jammu", "Kashmir", "Ladakh"]
@@ -26,6 +37,24 @@ region_crops = {
     "Kashmir": ["Rice", "Apple", "Saffron", "Walnut"],
     "Ladakh": ["Wheat", "Barley", "Apple"]
 }
+high_value_crops = ["Saffron", "Walnut", "Apple"]
+
+# Cultivated area range (HA) by region
+region_area_range = {
+    "Jammu": (500, 7000),
+    "Kashmir": (300, 5000),
+    "Ladakh": (50, 1500)
+}
+
+# Column storage of the loop engine's RecordBuffer
+COLUMN_TYPES = {
+    "Record_ID": "int64", "Year": "int16", "Date": "datetime64[s]", "Time_Period": CATEGORY,
+    "Region": CATEGORY, "District": CATEGORY, "Crop_Type": CATEGORY, "Season": CATEGORY,
+    "Cultivated_Area_HA": "float32", "Production_MT": "float32", "Export_Tons": "float32",
+    "Revenue_Cr": "float32", "Rainfall_mm": "float32", "Water_Usage_ML": "float32",
+    "Fertilizer_Usage_Tons": "float32"
+}
+columns = list(COLUMN_TYPES)
 
 # Function to determine season & rainfall based on month and region
 def get_season_and_rainfall(date_value, region):
@@ -40,58 +69,184 @@ def get_season_and_rainfall(date_value, region):
             rainfall = round(random.uniform(200, 600), 1)   # Winter
         else:
             rainfall = round(random.uniform(50, 250), 1)    # Summer
-    season = "Kharif" if 6 <= month <= 10 else "Rabi" if (11 <= month or month <= 4) else "Zaid"
-    return season, rainfall
-
-data = []
-
-for i in range(1, num_rows + 1):
-    year = random.choice(years)
-    region = random.choice(regions)
-    district = random.choice(districts[region])
-    crop = random.choice(region_crops[region])
-    
-    # Random date in the selected year
-    start_date = datetime(year, 1, 1)
-    end_date = datetime(year, 12, 31)
-    random_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-    
-    season, rainfall = get_season_and_rainfall(random_date, region)
+    return month_to_crop_season(month), rainfall
+
+# Row-by-row generator (original engine)
+def generate_loop(num_rows, start_id=1, years=years, regions_districts=districts):
+    region_names = list(regions_districts)
+    clock = profiling.clock("loop", num_rows)
+    buffer = RecordBuffer(COLUMN_TYPES, num_rows)
+
+    for i in range(start_id, start_id + num_rows):
+        year = random.choice(years)
+        region = random.choice(region_names)
+        district = random.choice(regions_districts[region])
+        crop = random.choice(region_crops[region])
+
+        # Random date in the selected year
+        random_date = random_date_in_year(year)
+
+        season, rainfall = get_season_and_rainfall(random_date, region)
+
+        # Bias values by region
+        if region == "Jammu":
+            cultivated_area = round(np.random.uniform(500, 7000), 2)
+        elif region == "Kashmir":
+            cultivated_area = round(np.random.uniform(300, 5000), 2)
+        else:  # Ladakh
+            cultivated_area = round(np.random.uniform(50, 1500), 2)
+
+        production = round(cultivated_area * np.random.uniform(0.6, 2.0), 2)
+        export_tons = round(production * np.random.uniform(0.1, 0.7), 2)
+
+        # Revenue: Kashmir’s saffron/walnuts more valuable
+        if crop in high_value_crops:
+            revenue = round(export_tons * np.random.uniform(0.5, 2.0), 2)
+        else:
+            revenue = round(export_tons * np.random.uniform(0.1, 0.8), 2)
+
+        water_usage = round(cultivated_area * np.random.uniform(0.3, 1.5), 2)
+        fertilizer_usage = round(cultivated_area * np.random.uniform(0.05, 0.25), 2)
+
+        buffer.append(
+            i, year, random_date, get_time_period(year), region, district, crop,
+            season, cultivated_area, production, export_tons, revenue,
+            rainfall, water_usage, fertilizer_usage
+        )
+
+    clock.lap("rows")
+    df = buffer.to_frame()
+    clock.lap("frame")
+    return df
+
+# Lookup tables for the batch engine (index = month, 0 unused)
+RAIN_LOW_BY_MONTH = np.array([0, 200, 200, 200, 200, 50, 600, 600, 600, 600, 600, 200, 200], dtype=float)
+RAIN_HIGH_BY_MONTH = np.array([0, 600, 600, 600, 600, 250, 1200, 1200, 1200, 1200, 1200, 600, 600], dtype=float)
+LADAKH_RAIN_RANGE = (50, 200)
+
+CROP_SAMPLER = GroupedChoice(region_crops)
+
+# Column-at-a-time generator: every column is drawn as one NumPy array
+# With `grid` (a Climate.ClimateGrid), rainfall is read from the shared climate grid;
+# `ladakh_rain_range` can be varied per scenario (see scenarios.py)
+def generate_batch(num_rows, rng, start_id=1, years=years, regions_districts=districts, grid=None,
+                   ladakh_rain_range=LADAKH_RAIN_RANGE):
+    import pandas as pd
+
+    n = num_rows
+    clock = profiling.clock("batch", n)
+    region_names = np.asarray(regions, dtype=object)
+
+    # Random date in a random year; month and season come from the calendar table
+    calendar = get_calendar(years)
+    day = calendar.sample_days(rng, n)
+    year = calendar.year[day]
+    date = calendar.date[day]
+    month = calendar.month[day]
+    season = np.asarray(CROP_SEASONS, dtype=object)[calendar.crop_season[day]]
+
+    locations = location_choice(regions_districts, regions)
+    region_idx, district_idx = locations.sample(rng, n)
+    region = region_names[region_idx]
+    district = np.asarray(locations.values, dtype=object)[district_idx]
+    crop = np.asarray(CROP_SAMPLER.values, dtype=object)[CROP_SAMPLER.sample(rng, region_idx)]
+
+    clock.lap("sample")
+
+    if grid is not None:
+        grid_district = grid.district_codes(locations.values)[district_idx]
+        rainfall = grid.take("rainfall", grid.index(grid_district, date))
+    else:
+        is_ladakh = region == "Ladakh"
+        rain_low = np.where(is_ladakh, ladakh_rain_range[0], RAIN_LOW_BY_MONTH[month])
+        rain_high = np.where(is_ladakh, ladakh_rain_range[1], RAIN_HIGH_BY_MONTH[month])
+        rainfall = np.round(rng.uniform(rain_low, rain_high, n), 1)
 
     # Bias values by region
-    if region == "Jammu":
-        cultivated_area = round(np.random.uniform(500, 7000), 2)
-    elif region == "Kashmir":
-        cultivated_area = round(np.random.uniform(300, 5000), 2)
-    else:  # Ladakh
-        cultivated_area = round(np.random.uniform(50, 1500), 2)
+    area_low = np.array([region_area_range[r][0] for r in regions], dtype=float)
+    area_high = np.array([region_area_range[r][1] for r in regions], dtype=float)
+    cultivated_area = np.round(rng.uniform(area_low[region_idx], area_high[region_idx], n), 2)
 
-    production = round(cultivated_area * np.random.uniform(0.6, 2.0), 2)
-    export_tons = round(production * np.random.uniform(0.1, 0.7), 2)
+    production = np.round(cultivated_area * rng.uniform(0.6, 2.0, n), 2)
+    export_tons = np.round(production * rng.uniform(0.1, 0.7, n), 2)
 
     # Revenue: Kashmir’s saffron/walnuts more valuable
-    if crop in ["Saffron", "Walnut", "Apple"]:
-        revenue = round(export_tons * np.random.uniform(0.5, 2.0), 2)
+    high_value = np.isin(crop, high_value_crops)
+    revenue_rate = rng.uniform(np.where(high_value, 0.5, 0.1), np.where(high_value, 2.0, 0.8), n)
+    revenue = np.round(export_tons * revenue_rate, 2)
+
+    water_usage = np.round(cultivated_area * rng.uniform(0.3, 1.5, n), 2)
+    fertilizer_usage = np.round(cultivated_area * rng.uniform(0.05, 0.25, n), 2)
+
+    time_period = np.asarray(TIME_PERIODS, dtype=object)[time_period_codes(year, 2019)]
+
+    clock.lap("derive")
+    df = pd.DataFrame({
+        "Record_ID": np.arange(start_id, start_id + n),
+        "Year": year,
+        "Date": date,
+        "Time_Period": time_period,
+        "Region": region,
+        "District": district,
+        "Crop_Type": crop,
+        "Season": season,
+        "Cultivated_Area_HA": cultivated_area,
+        "Production_MT": production,
+        "Export_Tons": export_tons,
+        "Revenue_Cr": revenue,
+        "Rainfall_mm": rainfall,
+        "Water_Usage_ML": water_usage,
+        "Fertilizer_Usage_Tons": fertilizer_usage
+    }, columns=columns)
+    clock.lap("frame")
+    return df
+
+# Stream the dataset in chunks; Record_ID keeps counting across chunks
+# (with `climate_grid`, the batch engines take rainfall from Climate's grid built with that seed;
+# `years` / `regions_districts` restrict the batch engines to part of the catalog)
+def iter_chunks(num_rows, chunk_size=CHUNK_SIZE, start_id=1, seed=None, mode="loop", climate_grid=None,
+                years=None, regions_districts=None):
+    grid = None
+    if climate_grid is not None:
+        from Climate import get_climate_grid
+        grid = get_climate_grid(climate_grid)
+    batch = bind_batch_options(generate_batch, mode, grid=grid, years=years, regions_districts=regions_districts)
+    return stream_chunks(SECTOR, generate_loop, batch, num_rows, chunk_size, start_id, seed, mode)
+
+# Rows/sec of the loop engine vs the batch engine
+def compare_engines(num_rows, seed=None):
+    results = {}
+    start = time.perf_counter()
+    generate_loop(num_rows)
+    results["loop"] = num_rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    generate_batch(num_rows, np.random.default_rng(seed))
+    results["batch"] = num_rows / (time.perf_counter() - start)
+
+    for mode, rate in results.items():
+        print(f"{mode:>5}: {rate:,.0f} rows/sec")
+    print(f"speed-up: {results['batch'] / results['loop']:.1f}x")
+    return results
+
+if __name__ == "__main__":
+    parser = build_parser("Generate the synthetic agriculture dataset.", NUM_ROWS, "agriculture.csv")
+    parser.add_argument("--compare", action="store_true",
+                        help="print rows/sec of both engines instead of writing the CSV")
+    parser.add_argument("--climate-grid", type=int, default=None, metavar="GRID_SEED",
+                        help="take rainfall from Climate's district×day grid built with this seed "
+                             "(--mode batch or counter)")
+    args = parser.parse_args()
+    if args.climate_grid is not None and args.mode == "loop":
+        parser.error("--climate-grid needs --mode batch or counter")
+
+    if args.compare:
+        compare_engines(args.rows, args.seed)
     else:
-        revenue = round(export_tons * np.random.uniform(0.1, 0.8), 2)
-
-    water_usage = round(cultivated_area * np.random.uniform(0.3, 1.5), 2)
-    fertilizer_usage = round(cultivated_area * np.random.uniform(0.05, 0.25), 2)
-
-    data.append([
-        i, year, random_date.date(), time_period_map[year], region, district, crop,
-        season, cultivated_area, production, export_tons, revenue,
-        rainfall, water_usage, fertilizer_usage
-    ])
-
-# Create DataFrame
-columns = [
-    "Record_ID", "Year", "Date", "Time_Period", "Region", "District", "Crop_Type",
-    "Season", "Cultivated_Area_HA", "Production_MT", "Export_Tons", "Revenue_Cr",
-    "Rainfall_mm", "Water_Usage_ML", "Fertilizer_Usage_Tons"
-]
-df = pd.DataFrame(data, columns=columns)
-
-# Save to CSV
-df.to_csv("agriculture.csv", index=False)
-print("✅ Improved dataset generated: agriculture.csv")
+        run_sector("Agriculture", args.rows, args.output, args.seed, args.chunk_size,
+                   args.shards, args.processes, fmt=args.format, start_id=args.start_id,
+                   mode=args.mode, climate_grid=args.climate_grid, **output_options(args))
+        if not args.no_raw:
+            print("✅ Improved dataset generated:", args.output)
+        if args.rollup:
+            print("✅ Rollup cube written to", args.rollup)
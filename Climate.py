@@ -1,16 +1,24 @@
 import random
-import pandas as pd
+import zlib
+from functools import lru_cache
+
 import numpy as np
-from datetime import datetime, timedelta
+
+from buffers import CATEGORY, RecordBuffer
+from common import CHUNK_SIZE, bind_batch_options, build_parser, output_options, stream_chunks
+from dates import SEASONS, get_calendar, month_to_season, random_date_in_year
+import profiling
+from runner import run_sector
+from sampling import location_choice
 
 # ----------------------------
 # Settings
 # ----------------------------
-random.seed(42)
-np.random.seed(42)
-
+SECTOR = "climate"
 NUM_ROWS = 100000
 YEARS = list(range(2014, 2026))  # longer range for climate trends
+BASE_YEAR = 2014
+WARMING_PER_YEAR = 0.1  # °C per year since BASE_YEAR
 
 # Regions & Districts
 regions_districts = {
@@ -20,30 +28,11 @@ regions_districts = {
                 "Kulgam", "Kupwara", "Pulwama", "Shopian", "Srinagar"],
     "Ladakh": ["Leh", "Kargil", "Drass", "Zanskar", "Nubra", "Sankoo", "Turtuk"]
 }
-
-# Generate random date within a year
-def random_date_in_year(year):
-    start = datetime(year, 1, 1)
-    end = datetime(year, 12, 31)
-    return (start + timedelta(days=random.randint(0, (end - start).days))).date()
-
-# Seasonal mapping
-def month_to_season(month):
-    if month in (4, 5, 6):
-        return "Summer"
-    if month in (7, 8, 9):
-        return "Monsoon"
-    if month in (10, 11):
-        return "Autumn"
-    if month in (12, 1, 2):
-        return "Winter"
-    if month == 3:
-        return "Spring"
-    return "Unknown"
+REGIONS = list(regions_districts)
 
 # Generate climate metrics
 def generate_temperature(region, year, month):
-    warming_trend = (year - 2014) * 0.1  # +0.1°C per year
+    warming_trend = (year - BASE_YEAR) * WARMING_PER_YEAR
     if region == "Jammu":
         base = random.uniform(15, 38)
     elif region == "Kashmir":
@@ -92,48 +81,351 @@ def extreme_weather(region, season):
         base_prob += 0.25  # blizzards
     return "Yes" if random.random() < base_prob else "No"
 
+# Column storage of the loop engine's RecordBuffer
+COLUMN_TYPES = {
+    "Record_ID": "int64", "Year": "int16", "Date": "datetime64[s]", "Region": CATEGORY,
+    "District": CATEGORY, "Season": CATEGORY, "Average_Temperature_C": "float32",
+    "Rainfall_mm": "float32", "Snowfall_mm": "float32", "Humidity_Percent": "float32",
+    "Air_Quality_Index": "int32", "Extreme_Weather": CATEGORY
+}
+COLUMNS = list(COLUMN_TYPES)
+
 # ----------------------------
 # Generate Dataset
 # ----------------------------
-rows = []
-for i in range(1, NUM_ROWS + 1):
-    year = random.choice(YEARS)
-    date_val = random_date_in_year(year)
-    month = date_val.month
-    season = month_to_season(month)
-    region = random.choice(list(regions_districts.keys()))
-    district = random.choice(regions_districts[region])
-
-    avg_temp = generate_temperature(region, year, month)
-    rainfall = generate_rainfall(region, month)
-    snowfall = generate_snowfall(region, month)
-    humidity = generate_humidity(region)
-    aqi = generate_aqi(region)
-    extreme = extreme_weather(region, season)
-
-    rows.append({
-        "Record_ID": i,
+def generate_loop(num_rows, start_id=1, years=YEARS, regions_districts=regions_districts):
+    region_names = list(regions_districts)
+    clock = profiling.clock("loop", num_rows)
+    buffer = RecordBuffer(COLUMN_TYPES, num_rows)
+    for i in range(start_id, start_id + num_rows):
+        year = random.choice(years)
+        date_val = random_date_in_year(year)
+        month = date_val.month
+        season = month_to_season(month)
+        region = random.choice(region_names)
+        district = random.choice(regions_districts[region])
+
+        avg_temp = generate_temperature(region, year, month)
+        rainfall = generate_rainfall(region, month)
+        snowfall = generate_snowfall(region, month)
+        humidity = generate_humidity(region)
+        aqi = generate_aqi(region)
+        extreme = extreme_weather(region, season)
+
+        buffer.append(
+            i, year, date_val, region, district, season, avg_temp, rainfall, snowfall, humidity,
+            aqi, extreme
+        )
+    clock.lap("rows")
+    df = buffer.to_frame()
+    clock.lap("frame")
+    return df
+
+# ----------------------------
+# Batch engine (column-at-a-time)
+# ----------------------------
+LOCATION_SAMPLER = location_choice(regions_districts, REGIONS)
+
+def _monthly_range(region_ranges):
+    """(region, month) -> (low, high) table; index 0 of the month axis is unused."""
+    return np.array([[region_ranges[r](m) for m in range(13)] for r in REGIONS], dtype=float)
+
+# Same rules as generate_rainfall / generate_snowfall, as lookup tables
+RAINFALL_RANGE = _monthly_range({
+    "Jammu": lambda m: (150, 600) if m in [7, 8, 9] else (10, 200),
+    "Kashmir": lambda m: (80, 400) if m in [7, 8, 9] else (10, 150),
+    "Ladakh": lambda m: (0, 60),
+})
+SNOWFALL_RANGE = _monthly_range({
+    "Jammu": lambda m: (0, 10) if m in [12, 1, 2] else (0, 0),
+    "Kashmir": lambda m: (20, 150) if m in [12, 1, 2] else (0, 20),
+    "Ladakh": lambda m: (50, 300) if m in [11, 12, 1, 2, 3] else (0, 30),
+})
+TEMPERATURE_RANGE = np.array([(15, 38), (-6, 30), (-25, 22)])  # Jammu, Kashmir, Ladakh
+HUMIDITY_RANGE = np.array([(40, 95), (50, 90), (20, 50)])
+AQI_RANGE = np.array([(70, 250), (40, 160), (10, 90)])
+
+def _draw_weather(rng, region_code, year, month, size, warming_per_year=WARMING_PER_YEAR,
+                  temperature_range=TEMPERATURE_RANGE):
+    """Temperature, rainfall, snowfall, humidity and AQI for `size` cells (region/year/month arrays broadcast)."""
+    warming_trend = (year - BASE_YEAR) * warming_per_year
+    base = rng.uniform(temperature_range[region_code, 0], temperature_range[region_code, 1], size)
+    avg_temp = np.round(base + warming_trend, 1)
+    rain_range = RAINFALL_RANGE[region_code, month]
+    rainfall = np.round(rng.uniform(rain_range[..., 0], rain_range[..., 1], size), 1)
+    snow_range = SNOWFALL_RANGE[region_code, month]
+    snowfall = np.round(rng.uniform(snow_range[..., 0], snow_range[..., 1], size), 1)
+    humidity = np.round(rng.uniform(HUMIDITY_RANGE[region_code, 0], HUMIDITY_RANGE[region_code, 1], size), 1)
+    aqi = rng.integers(AQI_RANGE[region_code, 0], AQI_RANGE[region_code, 1] + 1, size)
+    return avg_temp, rainfall, snowfall, humidity, aqi
+
+def _draw_extreme(rng, region_code, season, size):
+    # Extreme weather: floods in the Jammu monsoon, blizzards in Kashmir/Ladakh winters
+    is_jammu = region_code == REGIONS.index("Jammu")
+    extreme_prob = (0.05 + np.where((season == "Monsoon") & is_jammu, 0.20, 0.0)
+                    + np.where((season == "Winter") & ~is_jammu, 0.25, 0.0))
+    return rng.random(size) < extreme_prob
+
+# ----------------------------
+# District × day climate grid
+# ----------------------------
+class ClimateGrid:
+    """Daily weather for every district and every day of YEARS, drawn once.
+
+    Arrays are indexed [district, day], with districts in
+    LOCATION_SAMPLER.values order and days as in get_calendar(YEARS). The
+    rules are the batch engine's; values are stored as float32/int16
+    (about 2 MB) and widened again by `take`.
+    """
+
+    def __init__(self, seed):
+        rng = np.random.default_rng(seed)
+        calendar = get_calendar(YEARS)
+        self.districts = list(LOCATION_SAMPLER.values)
+        self.first_date = calendar.date[0]
+        self.num_days = len(calendar.date)
+        shape = (len(self.districts), self.num_days)
+        sizes = [len(regions_districts[r]) for r in REGIONS]
+        region_code = np.repeat(np.arange(len(REGIONS)), sizes)[:, None]
+
+        temperature, rainfall, snowfall, humidity, aqi = _draw_weather(
+            rng, region_code, calendar.year[None, :], calendar.month[None, :], shape)
+        self.temperature = temperature.astype(np.float32)
+        self.rainfall = rainfall.astype(np.float32)
+        self.snowfall = snowfall.astype(np.float32)
+        self.humidity = humidity.astype(np.float32)
+        self.aqi = aqi.astype(np.int16)
+
+    def district_codes(self, names):
+        """Grid rows for a list of district names (e.g. another sector's district table)."""
+        return np.array([self.districts.index(name) for name in names], dtype=np.intp)
+
+    def index(self, district_code, date):
+        """Flat cell index of each (grid district row, datetime64 date) pair."""
+        day = (np.asarray(date, dtype="datetime64[D]") - self.first_date).astype(np.int64)
+        if day.size and (day.min() < 0 or day.max() >= self.num_days):
+            raise ValueError(f"dates outside the climate grid ({YEARS[0]}-{YEARS[-1]})")
+        return district_code * self.num_days + day
+
+    def take(self, metric, cells):
+        """Values of `metric` ("temperature", "rainfall", ...) at flat `cells`."""
+        values = getattr(self, metric).ravel()[cells]
+        return values.astype(np.int64) if metric == "aqi" else np.round(values.astype(np.float64), 1)
+
+@lru_cache(maxsize=None)
+def get_climate_grid(seed):
+    """Shared, cached ClimateGrid for `seed`."""
+    return ClimateGrid(seed)
+
+# `warming_per_year` and `temperature_range` can be varied per scenario (see scenarios.py)
+def generate_batch(num_rows, rng, start_id=1, years=YEARS, regions_districts=regions_districts, grid=None,
+                   warming_per_year=WARMING_PER_YEAR, temperature_range=TEMPERATURE_RANGE):
+    import pandas as pd
+
+    n = num_rows
+    clock = profiling.clock("batch", n)
+    calendar = get_calendar(years)
+    day = calendar.sample_days(rng, n)
+    year = calendar.year[day]
+    date_val = calendar.date[day]
+    month = calendar.month[day]
+    season = np.asarray(SEASONS, dtype=object)[calendar.season[day]]
+    locations = location_choice(regions_districts, REGIONS)
+    region_code, district_code = locations.sample(rng, n)
+
+    clock.lap("sample")
+
+    if grid is not None:
+        # Same district and date -> same weather, in every sector using the grid
+        cells = grid.index(grid.district_codes(locations.values)[district_code], date_val)
+        avg_temp = grid.take("temperature", cells)
+        rainfall = grid.take("rainfall", cells)
+        snowfall = grid.take("snowfall", cells)
+        humidity = grid.take("humidity", cells)
+        aqi = grid.take("aqi", cells)
+    else:
+        avg_temp, rainfall, snowfall, humidity, aqi = _draw_weather(rng, region_code, year, month, n,
+                                                                    warming_per_year, temperature_range)
+    extreme = _draw_extreme(rng, region_code, season, n)
+
+    clock.lap("derive")
+    df = pd.DataFrame({
+        "Record_ID": np.arange(start_id, start_id + n),
         "Year": year,
-        "Date": date_val.isoformat(),
-        "Region": region,
-        "District": district,
+        "Date": date_val,
+        "Region": np.asarray(REGIONS, dtype=object)[region_code],
+        "District": np.asarray(locations.values, dtype=object)[district_code],
         "Season": season,
         "Average_Temperature_C": avg_temp,
         "Rainfall_mm": rainfall,
         "Snowfall_mm": snowfall,
         "Humidity_Percent": humidity,
         "Air_Quality_Index": aqi,
-        "Extreme_Weather": extreme
-    })
+        "Extreme_Weather": np.where(extreme, "Yes", "No").astype(object)
+    }, columns=COLUMNS)
+    clock.lap("frame")
+    return df
+
+# ----------------------------
+# Dense daily series with rolling aggregates
+# ----------------------------
+ROLLING_WINDOWS = (7, 30)  # days
+DENSE_COLUMNS = COLUMNS + [
+    "Rainfall_7d_mm", "Rainfall_30d_mm", "Snowfall_7d_mm", "Snowfall_30d_mm",
+    "Rainfall_YTD_mm", "Snowfall_YTD_mm", "Temperature_Anomaly_C", "Temperature_Anomaly_30d_C",
+]
+
+class TrailingSums:
+    """Trailing `window`-day sums of one daily series, fed block by block.
+
+    Only the last window - 1 values are carried between blocks, so memory
+    does not grow with the length of the series. A sum is NaN until a full
+    window of days has been seen.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.tail = np.empty(0)
+
+    def update(self, values):
+        series = np.concatenate([self.tail, values])
+        cumulative = np.concatenate(([0.0], np.cumsum(series)))
+        sums = np.full(len(series), np.nan)
+        sums[self.window - 1:] = cumulative[self.window:] - cumulative[:-self.window]
+        self.tail = series[max(len(series) - self.window + 1, 0):]
+        return sums[len(series) - len(values):]
+
+def _dense_block(seed, region, district, year, warming_per_year, temperature_range):
+    """One (district, year) block of daily weather, from its own generator."""
+    rng = np.random.default_rng([seed, zlib.crc32(district.encode()), year])
+    calendar = get_calendar([year])
+    days = len(calendar.date)
+    region_code = REGIONS.index(region)
+    season = np.asarray(SEASONS, dtype=object)[calendar.season]
+    weather = _draw_weather(rng, region_code, year, calendar.month, days, warming_per_year, temperature_range)
+    extreme = _draw_extreme(rng, region_code, season, days)
+    return calendar, season, weather, extreme
+
+def iter_dense(seed, chunk_size=CHUNK_SIZE, start_id=1, years=YEARS, regions_districts=regions_districts,
+               warming_per_year=WARMING_PER_YEAR, temperature_range=TEMPERATURE_RANGE):
+    """Yield every day of every district over `years` with rolling aggregates (DENSE_COLUMNS).
+
+    Rows run district by district, day by day, in DataFrames of about
+    `chunk_size` rows. Each (district, year) block is drawn with the batch
+    rules from a generator seeded with (seed, district, year), so it does not
+    depend on the chunking or on the other years asked for. The 7/30-day
+    sums continue across the year blocks of a district (and restart after a
+    gap in `years`); the YTD totals restart every 1 January. Temperature
+    anomalies are against the region's baseline climate: the middle of its
+    temperature range, i.e. BASE_YEAR without warming.
+    """
+    import pandas as pd
+
+    if seed is None:
+        raise ValueError("dense mode needs an explicit seed")
+    baseline = np.asarray(temperature_range).mean(axis=1)
+    pending, pending_rows = [], 0
+    next_id = start_id
+
+    def flush():
+        clock = profiling.clock("dense", pending_rows)
+        data = {name: np.concatenate([block[name] for block in pending]) for name in DENSE_COLUMNS[1:]}
+        df = pd.DataFrame({"Record_ID": np.arange(next_id, next_id + pending_rows), **data},
+                          columns=DENSE_COLUMNS)
+        clock.lap("frame")
+        return df
+
+    for region in regions_districts:
+        for district in regions_districts[region]:
+            previous_year = None
+            for year in sorted(years):
+                days = len(get_calendar([year]).date)
+                clock = profiling.clock("dense", days)
+                if previous_year is None or year != previous_year + 1:
+                    rain_sums = [TrailingSums(w) for w in ROLLING_WINDOWS]
+                    snow_sums = [TrailingSums(w) for w in ROLLING_WINDOWS]
+                    anomaly_sums = TrailingSums(ROLLING_WINDOWS[-1])
+                previous_year = year
+                calendar, season, (temp, rain, snow, humidity, aqi), extreme = _dense_block(
+                    seed, region, district, year, warming_per_year, temperature_range)
+                clock.lap("sample")
+
+                anomaly = np.round(temp - baseline[REGIONS.index(region)], 1)
+                block = {
+                    "Year": calendar.year,
+                    "Date": calendar.date,
+                    "Region": np.full(days, region, dtype=object),
+                    "District": np.full(days, district, dtype=object),
+                    "Season": season,
+                    "Average_Temperature_C": temp,
+                    "Rainfall_mm": rain,
+                    "Snowfall_mm": snow,
+                    "Humidity_Percent": humidity,
+                    "Air_Quality_Index": aqi,
+                    "Extreme_Weather": np.where(extreme, "Yes", "No").astype(object),
+                    "Rainfall_YTD_mm": np.round(np.cumsum(rain), 1),
+                    "Snowfall_YTD_mm": np.round(np.cumsum(snow), 1),
+                    "Temperature_Anomaly_C": anomaly,
+                    "Temperature_Anomaly_30d_C": np.round(anomaly_sums.update(anomaly) / ROLLING_WINDOWS[-1], 2),
+                }
+                for window, rain_window, snow_window in zip(ROLLING_WINDOWS, rain_sums, snow_sums):
+                    block[f"Rainfall_{window}d_mm"] = np.round(rain_window.update(rain), 1)
+                    block[f"Snowfall_{window}d_mm"] = np.round(snow_window.update(snow), 1)
+                clock.lap("rolling")
+
+                pending.append(block)
+                pending_rows += days
+                if pending_rows >= chunk_size:
+                    yield flush()
+                    next_id += pending_rows
+                    pending, pending_rows = [], 0
+    if pending:
+        yield flush()
+
+# Stream the dataset in chunks; Record_ID keeps counting across chunks
+# (with `climate_grid`, the batch engines read weather from the grid built with that seed;
+# `years` / `regions_districts` restrict the batch engines to part of the catalog;
+# `dense` ignores num_rows and mode and streams iter_dense over `years` instead)
+def iter_chunks(num_rows, chunk_size=CHUNK_SIZE, start_id=1, seed=None, mode="loop", climate_grid=None,
+                years=None, regions_districts=None, dense=False):
+    if dense:
+        if climate_grid is not None:
+            raise ValueError("dense mode draws its own daily weather; it does not read a climate grid")
+        dense_chunks = bind_batch_options(iter_dense, "dense", years=years, regions_districts=regions_districts)
+        return dense_chunks(seed, chunk_size, start_id)
+    grid = None if climate_grid is None else get_climate_grid(climate_grid)
+    batch = bind_batch_options(generate_batch, mode, grid=grid, years=years,
+                               regions_districts=regions_districts)
+    return stream_chunks(SECTOR, generate_loop, batch, num_rows, chunk_size, start_id, seed, mode)
 
 # ----------------------------
 # Save to CSV
 # ----------------------------
-df = pd.DataFrame(rows, columns=[
-    "Record_ID", "Year", "Date", "Region", "District", "Season",
-    "Average_Temperature_C", "Rainfall_mm", "Snowfall_mm",
-    "Humidity_Percent", "Air_Quality_Index", "Extreme_Weather"
-])
-
-df.to_csv("climate.csv", index=False)
-print("✅ Improved climate.csv generated with", len(df), "rows and", len(df.columns), "columns.")
+if __name__ == "__main__":
+    parser = build_parser("Generate the synthetic climate dataset.", NUM_ROWS,
+                          "climate.csv", default_seed=42)
+    parser.add_argument("--climate-grid", type=int, default=None, metavar="GRID_SEED",
+                        help="read weather from the shared district×day grid built with this seed "
+                             "(--mode batch or counter)")
+    parser.add_argument("--dense", action="store_true",
+                        help="write every day of every district with rolling rainfall/snowfall and "
+                             "temperature anomalies (ignores --rows and --mode)")
+    parser.add_argument("--years", type=int, nargs=2, default=None, metavar=("FIRST", "LAST"),
+                        help="years to generate (dense mode or the batch engines)")
+    args = parser.parse_args()
+    if args.climate_grid is not None and (args.dense or args.mode == "loop"):
+        parser.error("--climate-grid needs --mode batch or counter (and no --dense)")
+    if args.dense and args.shards > 1:
+        parser.error("--dense streams each district in one pass and does not support --shards")
+    if args.years and not args.dense and args.mode == "loop":
+        parser.error("--years needs --dense or a batch --mode")
+    years = list(range(args.years[0], args.years[1] + 1)) if args.years else None
+    total = run_sector("Climate", args.rows, args.output, args.seed, args.chunk_size,
+                       args.shards, args.processes, fmt=args.format, start_id=args.start_id,
+                       mode=args.mode, climate_grid=args.climate_grid, years=years, dense=args.dense,
+                       **output_options(args))
+    if not args.no_raw:
+        print("✅ Improved", args.output, "generated with", total, "rows and",
+              len(DENSE_COLUMNS if args.dense else COLUMNS), "columns.")
+    if args.rollup:
+        print("✅ Rollup cube written to", args.rollup)
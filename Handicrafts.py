@@ -1,14 +1,17 @@
-import pandas as pd
 import numpy as np
 import random
-from datetime import datetime, timedelta
+
+from buffers import CATEGORY, RecordBuffer
+from common import CHUNK_SIZE, bind_batch_options, build_parser, output_options, stream_chunks
+from dates import TIME_PERIODS, get_calendar, random_date_in_year, time_period_codes
+import profiling
+from runner import run_sector
+from sampling import AliasTable, location_choice, uniform_table
 
 # ----------------------------
 # Settings
 # ----------------------------
-random.seed(42)
-np.random.seed(42)
-
+SECTOR = "handicrafts"
 NUM_ROWS = 100000
 YEARS = list(range(2014, 2026))  # 2014–2025
 
@@ -27,80 +30,154 @@ regions_districts = {
                 "Kulgam", "Kupwara", "Pulwama", "Shopian", "Srinagar"],
     "Ladakh": ["Leh", "Kargil", "Drass", "Zanskar", "Nubra", "Sankoo", "Turtuk"]
 }
+REGIONS = list(regions_districts)
 
 industry_types = ["Handicrafts", "Textile", "Food Processing", "Mining", "Tourism Support", "Small Scale"]
 handicraft_items = ["Carpets", "Shawls", "Woodwork", "Papier-mâché", "Metalware", "Pashmina"]
 
-# Generate random date within a year
-def random_date_in_year(year):
-    start = datetime(year, 1, 1)
-    end = datetime(year, 12, 31)
-    delta_days = (end - start).days
-    return (start + timedelta(days=random.randint(0, delta_days))).date()
+# Column storage of the loop engine's RecordBuffer
+COLUMN_TYPES = {
+    "Record_ID": "int64", "Year": "int16", "Date": "datetime64[s]", "Time_Period": CATEGORY,
+    "Region": CATEGORY, "District": CATEGORY, "Industry_Type": CATEGORY,
+    "Handicraft_Item": CATEGORY, "Units_Registered": "int32", "Production_Value_Cr": "float32",
+    "Export_Value_Cr": "float32", "Employment_Generated": "int32",
+    "Govt_Schemes_Available": CATEGORY
+}
+COLUMNS = list(COLUMN_TYPES)
 
 # ----------------------------
 # Generate Dataset
 # ----------------------------
-rows = []
-for i in range(1, NUM_ROWS + 1):
-    year = random.choice(YEARS)
-    date_val = random_date_in_year(year)
-    time_period = get_time_period(year)
-    region = random.choice(list(regions_districts.keys()))
-    district = random.choice(regions_districts[region])
-    industry_type = random.choice(industry_types)
+def generate_loop(num_rows, start_id=1, years=YEARS, regions_districts=regions_districts):
+    region_names = list(regions_districts)
+    clock = profiling.clock("loop", num_rows)
+    buffer = RecordBuffer(COLUMN_TYPES, num_rows)
+    for i in range(start_id, start_id + num_rows):
+        year = random.choice(years)
+        date_val = random_date_in_year(year)
+        time_period = get_time_period(year)
+        region = random.choice(region_names)
+        district = random.choice(regions_districts[region])
+        industry_type = random.choice(industry_types)
+
+        # Units registered differ by region
+        if region == "Jammu":
+            units_registered = random.randint(50, 1200)
+        elif region == "Kashmir":
+            units_registered = random.randint(100, 1500)
+        else:  # Ladakh
+            units_registered = random.randint(5, 400)
+
+        # Handicrafts more common in Kashmir
+        if industry_type == "Handicrafts" and region == "Kashmir":
+            handicraft_item = random.choice(handicraft_items)
+        elif industry_type == "Handicrafts":
+            handicraft_item = random.choice(handicraft_items + ["None"])  # Some non-handicraft areas
+        else:
+            handicraft_item = "None"
+
+        # Production & export values scale with units
+        production_value = round(units_registered * np.random.uniform(1.0, 10.0), 2)  # crores
+        export_value = round(production_value * np.random.uniform(0.3, 0.9), 2)
+
+        # Employment scales with industry size
+        employment_generated = int(units_registered * np.random.uniform(5, 20))
+
+        govt_schemes = random.choice(["Yes", "No"])
+
+        buffer.append(
+            i, year, date_val, time_period, region, district, industry_type, handicraft_item,
+            units_registered, production_value, export_value, employment_generated, govt_schemes
+        )
+    clock.lap("rows")
+    df = buffer.to_frame()
+    clock.lap("frame")
+    return df
+
+# ----------------------------
+# Batch engine (column-at-a-time)
+# ----------------------------
+INDUSTRY_SAMPLER = uniform_table(len(industry_types))
+SCHEMES_SAMPLER = uniform_table(2)  # Yes / No
+
+# Handicraft item codes index handicraft_items + ["None"]; Kashmir never draws "None"
+ITEM_VALUES = handicraft_items + ["None"]
+ITEM_SAMPLER = AliasTable([[1.0] * len(handicraft_items) + [0.0],  # Kashmir
+                           [1.0] * len(ITEM_VALUES)])              # elsewhere
+
+UNITS_RANGE = np.array([(50, 1200), (100, 1500), (5, 400)])  # Jammu, Kashmir, Ladakh
+
+# `units_range` can be varied per scenario (see scenarios.py)
+def generate_batch(num_rows, rng, start_id=1, years=YEARS, regions_districts=regions_districts,
+                   units_range=UNITS_RANGE):
+    import pandas as pd
+
+    n = num_rows
+    clock = profiling.clock("batch", n)
+    calendar = get_calendar(years)
+    day = calendar.sample_days(rng, n)
+    year = calendar.year[day]
+    date_val = calendar.date[day]
+    locations = location_choice(regions_districts, REGIONS)
+    region_code, district_code = locations.sample(rng, n)
+    industry_code = INDUSTRY_SAMPLER.sample(rng, n)
+
+    clock.lap("sample")
 
     # Units registered differ by region
-    if region == "Jammu":
-        units_registered = random.randint(50, 1200)
-    elif region == "Kashmir":
-        units_registered = random.randint(100, 1500)
-    else:  # Ladakh
-        units_registered = random.randint(5, 400)
-
-    # Handicrafts more common in Kashmir
-    if industry_type == "Handicrafts" and region == "Kashmir":
-        handicraft_item = random.choice(handicraft_items)
-    elif industry_type == "Handicrafts":
-        handicraft_item = random.choice(handicraft_items + ["None"])  # Some non-handicraft areas
-    else:
-        handicraft_item = "None"
+    units_registered = rng.integers(units_range[region_code, 0], units_range[region_code, 1] + 1)
+
+    # Handicrafts more common in Kashmir; other industries have no item
+    is_kashmir = region_code == REGIONS.index("Kashmir")
+    item_code = ITEM_SAMPLER.sample(rng, n, given=np.where(is_kashmir, 0, 1))
+    is_handicrafts = industry_code == industry_types.index("Handicrafts")
+    item_code = np.where(is_handicrafts, item_code, len(ITEM_VALUES) - 1)
 
     # Production & export values scale with units
-    production_value = round(units_registered * np.random.uniform(1.0, 10.0), 2)  # crores
-    export_value = round(production_value * np.random.uniform(0.3, 0.9), 2)
+    production_value = np.round(units_registered * rng.uniform(1.0, 10.0, n), 2)
+    export_value = np.round(production_value * rng.uniform(0.3, 0.9, n), 2)
 
     # Employment scales with industry size
-    employment_generated = int(units_registered * np.random.uniform(5, 20))
+    employment_generated = (units_registered * rng.uniform(5, 20, n)).astype(np.int64)
 
-    govt_schemes = random.choice(["Yes", "No"])
+    govt_schemes = SCHEMES_SAMPLER.sample(rng, n)
 
-    rows.append({
-        "Record_ID": i,
+    clock.lap("derive")
+    df = pd.DataFrame({
+        "Record_ID": np.arange(start_id, start_id + n),
         "Year": year,
-        "Date": date_val.isoformat(),
-        "Time_Period": time_period,
-        "Region": region,
-        "District": district,
-        "Industry_Type": industry_type,
-        "Handicraft_Item": handicraft_item,
+        "Date": date_val,
+        "Time_Period": np.asarray(TIME_PERIODS, dtype=object)[time_period_codes(year, 2025)],
+        "Region": np.asarray(REGIONS, dtype=object)[region_code],
+        "District": np.asarray(locations.values, dtype=object)[district_code],
+        "Industry_Type": np.asarray(industry_types, dtype=object)[industry_code],
+        "Handicraft_Item": np.asarray(ITEM_VALUES, dtype=object)[item_code],
         "Units_Registered": units_registered,
         "Production_Value_Cr": production_value,
         "Export_Value_Cr": export_value,
         "Employment_Generated": employment_generated,
-        "Govt_Schemes_Available": govt_schemes
-    })
+        "Govt_Schemes_Available": np.asarray(["Yes", "No"], dtype=object)[govt_schemes]
+    }, columns=COLUMNS)
+    clock.lap("frame")
+    return df
+
+# Stream the dataset in chunks; Record_ID keeps counting across chunks
+# (`years` / `regions_districts` restrict the batch engines to part of the catalog)
+def iter_chunks(num_rows, chunk_size=CHUNK_SIZE, start_id=1, seed=None, mode="loop", years=None,
+                regions_districts=None):
+    batch = bind_batch_options(generate_batch, mode, years=years, regions_districts=regions_districts)
+    return stream_chunks(SECTOR, generate_loop, batch, num_rows, chunk_size, start_id, seed, mode)
 
 # ----------------------------
 # Save to CSV
 # ----------------------------
-df = pd.DataFrame(rows, columns=[
-    "Record_ID", "Year", "Date", "Time_Period", "Region", "District",
-    "Industry_Type", "Handicraft_Item", "Units_Registered",
-    "Production_Value_Cr", "Export_Value_Cr", "Employment_Generated",
-    "Govt_Schemes_Available"
-])
-
-df.to_csv("industry_handicrafts.csv", index=False)
-print("✅ industry_handicrafts.csv generated with", len(df), "rows and", len(df.columns), "columns.")
-
+if __name__ == "__main__":
+    args = build_parser("Generate the synthetic industry & handicrafts dataset.", NUM_ROWS,
+                        "industry_handicrafts.csv", default_seed=42).parse_args()
+    total = run_sector("Handicrafts", args.rows, args.output, args.seed, args.chunk_size,
+                       args.shards, args.processes, fmt=args.format, start_id=args.start_id,
+                       mode=args.mode, **output_options(args))
+    if not args.no_raw:
+        print("✅", args.output, "generated with", total, "rows and", len(COLUMNS), "columns.")
+    if args.rollup:
+        print("✅ Rollup cube written to", args.rollup)
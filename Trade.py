@@ -1,16 +1,21 @@
-import pandas as pd
 import numpy as np
 import random
-from datetime import datetime, timedelta
+
+from buffers import CATEGORY, RecordBuffer
+from common import CHUNK_SIZE, bind_batch_options, build_parser, output_options, stream_chunks
+from dates import TIME_PERIODS, get_calendar, random_date_in_year, time_period_codes
+import profiling
+from runner import run_sector
+from sampling import location_choice, uniform_table
 
 # ----------------------------
 # Settings
 # ----------------------------
-random.seed(42)
-np.random.seed(42)
-
+SECTOR = "trade"
 NUM_ROWS = 100000
 YEARS = list(range(2014, 2026))  # 2014–2025
+BASE_YEAR = 2014
+TRADE_GROWTH_PER_YEAR = 0.03  # ~3% growth per year since BASE_YEAR
 
 # Time period logic
 def get_time_period(year):
@@ -24,88 +29,165 @@ regions_districts = {
                 "Kulgam", "Kupwara", "Pulwama", "Shopian", "Srinagar"],
     "Ladakh": ["Leh", "Kargil", "Drass", "Zanskar", "Nubra", "Sankoo", "Turtuk"]
 }
+REGIONS = list(regions_districts)
 
 # Market types & commodities
 market_types = ["Wholesale", "Retail", "Export Hub"]
 commodities = ["Saffron", "Handicrafts", "Dry Fruits", "Wool", "Tea", "Spices", "Carpets", "Metalware", "Flowers"]
 
-# Random date in a given year
-def random_date_in_year(year):
-    start = datetime(year, 1, 1)
-    end = datetime(year, 12, 31)
-    return (start + timedelta(days=random.randint(0, (end - start).days))).date()
+# Commodity boosts (e.g., Saffron & Handicrafts are high value)
+commodity_multiplier = {
+    "Saffron": 1.5,
+    "Handicrafts": 1.3,
+    "Carpets": 1.2,
+    "Dry Fruits": 1.1,
+    "Wool": 1.0,
+    "Tea": 0.9,
+    "Spices": 1.0,
+    "Metalware": 0.8,
+    "Flowers": 0.7
+}
+
+# Column storage of the loop engine's RecordBuffer
+COLUMN_TYPES = {
+    "Record_ID": "int64", "Year": "int16", "Date": "datetime64[s]", "Time_Period": CATEGORY,
+    "Region": CATEGORY, "District": CATEGORY, "Market_Type": CATEGORY, "Trade_Volume_Cr": "float32",
+    "Export_Value_Cr": "float32", "Import_Value_Cr": "float32", "Major_Commodity": CATEGORY,
+    "Employment_in_Trade": "int32", "GST_Collection_Cr": "float32"
+}
+COLUMNS = list(COLUMN_TYPES)
 
 # ----------------------------
 # Generate Dataset
 # ----------------------------
-rows = []
-for i in range(1, NUM_ROWS + 1):
-    year = random.choice(YEARS)
-    date_val = random_date_in_year(year)
-    time_period = get_time_period(year)
-    region = random.choice(list(regions_districts.keys()))
-    district = random.choice(regions_districts[region])
-    market_type = random.choice(market_types)
-    commodity = random.choice(commodities)
-
-    # Region bias in trade volume
-    if region == "Jammu":
-        base_trade = np.random.uniform(500, 4000)
-    elif region == "Kashmir":
-        base_trade = np.random.uniform(1000, 5000)
-    else:  # Ladakh
-        base_trade = np.random.uniform(100, 1500)
-
-    # Commodity boosts (e.g., Saffron & Handicrafts are high value)
-    commodity_multiplier = {
-        "Saffron": 1.5,
-        "Handicrafts": 1.3,
-        "Carpets": 1.2,
-        "Dry Fruits": 1.1,
-        "Wool": 1.0,
-        "Tea": 0.9,
-        "Spices": 1.0,
-        "Metalware": 0.8,
-        "Flowers": 0.7
-    }[commodity]
-
-    # Year trend → gradual increase in trade volume
-    year_factor = 1 + (year - 2014) * 0.03  # ~3% growth per year
-
-    trade_volume = round(base_trade * commodity_multiplier * year_factor, 2)
-
-    export_value = round(trade_volume * np.random.uniform(0.3, 0.8), 2)
-    import_value = round(trade_volume * np.random.uniform(0.1, 0.5), 2)
+def generate_loop(num_rows, start_id=1, years=YEARS, regions_districts=regions_districts):
+    region_names = list(regions_districts)
+    clock = profiling.clock("loop", num_rows)
+    buffer = RecordBuffer(COLUMN_TYPES, num_rows)
+    for i in range(start_id, start_id + num_rows):
+        year = random.choice(years)
+        date_val = random_date_in_year(year)
+        time_period = get_time_period(year)
+        region = random.choice(region_names)
+        district = random.choice(regions_districts[region])
+        market_type = random.choice(market_types)
+        commodity = random.choice(commodities)
+
+        # Region bias in trade volume
+        if region == "Jammu":
+            base_trade = np.random.uniform(500, 4000)
+        elif region == "Kashmir":
+            base_trade = np.random.uniform(1000, 5000)
+        else:  # Ladakh
+            base_trade = np.random.uniform(100, 1500)
+
+        # Commodity boosts (e.g., Saffron & Handicrafts are high value)
+        multiplier = commodity_multiplier[commodity]
+
+        # Year trend → gradual increase in trade volume
+        year_factor = 1 + (year - BASE_YEAR) * TRADE_GROWTH_PER_YEAR
+
+        trade_volume = round(base_trade * multiplier * year_factor, 2)
+
+        export_value = round(trade_volume * np.random.uniform(0.3, 0.8), 2)
+        import_value = round(trade_volume * np.random.uniform(0.1, 0.5), 2)
+
+        # Employment scales with market type
+        if market_type == "Wholesale":
+            employment = random.randint(500, 15000)
+        elif market_type == "Export Hub":
+            employment = random.randint(1000, 20000)
+        else:  # Retail
+            employment = random.randint(100, 5000)
+
+        gst_collection = round(trade_volume * np.random.uniform(0.05, 0.18), 2)
+
+        buffer.append(
+            i, year, date_val, time_period, region, district, market_type, trade_volume,
+            export_value, import_value, commodity, employment, gst_collection
+        )
+    clock.lap("rows")
+    df = buffer.to_frame()
+    clock.lap("frame")
+    return df
+
+# ----------------------------
+# Batch engine (column-at-a-time)
+# ----------------------------
+MARKET_SAMPLER = uniform_table(len(market_types))
+COMMODITY_SAMPLER = uniform_table(len(commodities))
+
+BASE_TRADE_RANGE = np.array([(500, 4000), (1000, 5000), (100, 1500)])  # Jammu, Kashmir, Ladakh
+EMPLOYMENT_RANGE = np.array([(500, 15000), (100, 5000), (1000, 20000)])  # Wholesale, Retail, Export Hub
+COMMODITY_MULTIPLIER = np.array([commodity_multiplier[c] for c in commodities])
+
+# `trade_growth_per_year` can be varied per scenario (see scenarios.py)
+def generate_batch(num_rows, rng, start_id=1, years=YEARS, regions_districts=regions_districts,
+                   trade_growth_per_year=TRADE_GROWTH_PER_YEAR):
+    import pandas as pd
+
+    n = num_rows
+    clock = profiling.clock("batch", n)
+    calendar = get_calendar(years)
+    day = calendar.sample_days(rng, n)
+    year = calendar.year[day]
+    date_val = calendar.date[day]
+    locations = location_choice(regions_districts, REGIONS)
+    region_code, district_code = locations.sample(rng, n)
+    market_code = MARKET_SAMPLER.sample(rng, n)
+    commodity_code = COMMODITY_SAMPLER.sample(rng, n)
+
+    clock.lap("sample")
+
+    # Region bias in trade volume, commodity boost and ~3% growth per year
+    base_trade = rng.uniform(BASE_TRADE_RANGE[region_code, 0], BASE_TRADE_RANGE[region_code, 1], n)
+    year_factor = 1 + (year - BASE_YEAR) * trade_growth_per_year
+    trade_volume = np.round(base_trade * COMMODITY_MULTIPLIER[commodity_code] * year_factor, 2)
+
+    export_value = np.round(trade_volume * rng.uniform(0.3, 0.8, n), 2)
+    import_value = np.round(trade_volume * rng.uniform(0.1, 0.5, n), 2)
 
     # Employment scales with market type
-    if market_type == "Wholesale":
-        employment = random.randint(500, 15000)
-    elif market_type == "Export Hub":
-        employment = random.randint(1000, 20000)
-    else:  # Retail
-        employment = random.randint(100, 5000)
+    employment = rng.integers(EMPLOYMENT_RANGE[market_code, 0], EMPLOYMENT_RANGE[market_code, 1] + 1)
 
-    gst_collection = round(trade_volume * np.random.uniform(0.05, 0.18), 2)
+    gst_collection = np.round(trade_volume * rng.uniform(0.05, 0.18, n), 2)
 
-    rows.append({
-        "Record_ID": i,
+    clock.lap("derive")
+    df = pd.DataFrame({
+        "Record_ID": np.arange(start_id, start_id + n),
         "Year": year,
-        "Date": date_val.isoformat(),
-        "Time_Period": time_period,
-        "Region": region,
-        "District": district,
-        "Market_Type": market_type,
+        "Date": date_val,
+        "Time_Period": np.asarray(TIME_PERIODS, dtype=object)[time_period_codes(year, 2025)],
+        "Region": np.asarray(REGIONS, dtype=object)[region_code],
+        "District": np.asarray(locations.values, dtype=object)[district_code],
+        "Market_Type": np.asarray(market_types, dtype=object)[market_code],
         "Trade_Volume_Cr": trade_volume,
         "Export_Value_Cr": export_value,
         "Import_Value_Cr": import_value,
-        "Major_Commodity": commodity,
+        "Major_Commodity": np.asarray(commodities, dtype=object)[commodity_code],
         "Employment_in_Trade": employment,
         "GST_Collection_Cr": gst_collection
-    })
+    }, columns=COLUMNS)
+    clock.lap("frame")
+    return df
+
+# Stream the dataset in chunks; Record_ID keeps counting across chunks
+# (`years` / `regions_districts` restrict the batch engines to part of the catalog)
+def iter_chunks(num_rows, chunk_size=CHUNK_SIZE, start_id=1, seed=None, mode="loop", years=None,
+                regions_districts=None):
+    batch = bind_batch_options(generate_batch, mode, years=years, regions_districts=regions_districts)
+    return stream_chunks(SECTOR, generate_loop, batch, num_rows, chunk_size, start_id, seed, mode)
 
 # ----------------------------
 # Save to CSV
 # ----------------------------
-df = pd.DataFrame(rows)
-df.to_csv("trade_commerce.csv", index=False)
-print("✅ trade_commerce.csv generated with", len(df), "rows and", len(df.columns), "columns.")
+if __name__ == "__main__":
+    args = build_parser("Generate the synthetic trade & commerce dataset.", NUM_ROWS,
+                        "trade_commerce.csv", default_seed=42).parse_args()
+    total = run_sector("Trade", args.rows, args.output, args.seed, args.chunk_size,
+                       args.shards, args.processes, fmt=args.format, start_id=args.start_id,
+                       mode=args.mode, **output_options(args))
+    if not args.no_raw:
+        print("✅", args.output, "generated with", total, "rows and", len(COLUMNS), "columns.")
+    if args.rollup:
+        print("✅ Rollup cube written to", args.rollup)
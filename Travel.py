@@ -1,16 +1,21 @@
 import random
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+
+from buffers import CATEGORY, RecordBuffer
+from common import CHUNK_SIZE, bind_batch_options, build_parser, output_options, stream_chunks
+from dates import SEASONS, TIME_PERIODS, get_calendar, month_to_season, random_date_in_year, time_period_codes
+import profiling
+from runner import run_sector
+from sampling import AliasTable, location_choice, uniform_table
 
 # ----------------------------
 # Settings
 # ----------------------------
-random.seed(42)
-np.random.seed(42)
-
+SECTOR = "travel"
 NUM_ROWS = 100000
 YEARS = list(range(2014, 2026))  # 2014–2025
+BASE_YEAR = 2014
+FOOTFALL_GROWTH_PER_YEAR = 0.04  # 4% more tourists per year since BASE_YEAR
 
 # Time period logic
 def get_time_period(year):
@@ -24,6 +29,7 @@ regions_districts = {
                 "Kulgam", "Kupwara", "Pulwama", "Shopian", "Srinagar"],
     "Ladakh": ["Leh", "Kargil", "Drass", "Zanskar", "Nubra", "Sankoo", "Turtuk"]
 }
+REGIONS = list(regions_districts)
 
 # Tourist types & destination types
 tourist_types = ["Domestic", "International"]
@@ -32,25 +38,13 @@ destination_types = ["Hill Station", "Heritage", "Wildlife", "Pilgrimage", "Adve
 # ----------------------------
 # Helper Functions
 # ----------------------------
-def month_to_season(month):
-    if month in (4, 5, 6): return "Summer"
-    if month in (7, 8, 9): return "Monsoon"
-    if month in (10, 11): return "Autumn"
-    if month in (12, 1, 2): return "Winter"
-    if month == 3: return "Spring"
-    return "Unknown"
-
-def random_date_in_year(year):
-    start, end = datetime(year, 1, 1), datetime(year, 12, 31)
-    return (start + timedelta(days=random.randint(0, (end - start).days))).date()
-
 def is_festival_season(season, destination_type):
     base_prob = 0.08
     if season in ("Summer", "Winter"): base_prob += 0.12
     if destination_type == "Pilgrimage": base_prob += 0.10
     return random.random() < min(base_prob, 0.9)
 
-def generate_footfall(region, destination_type, year):
+def footfall_range(region, destination_type):
     # Base ranges
     if destination_type == "Pilgrimage": low, high = 5000, 500000
     elif destination_type == "Hill Station": low, high = 2000, 300000
@@ -63,9 +57,13 @@ def generate_footfall(region, destination_type, year):
         low, high = int(low * 0.3), int(high * 0.5)
         if destination_type == "Adventure":
             low, high = int(low * 2), int(high * 2)  # Ladakh = Adventure hub
+    return low, high
 
-    # Yearly growth (4% increase per year since 2014)
-    growth_factor = 1 + (year - 2014) * 0.04
+def generate_footfall(region, destination_type, year):
+    low, high = footfall_range(region, destination_type)
+
+    # Yearly growth since BASE_YEAR
+    growth_factor = 1 + (year - BASE_YEAR) * FOOTFALL_GROWTH_PER_YEAR
     return int(random.randint(low, high) * growth_factor)
 
 def estimate_revenue_crore(footfall, avg_stay_days, tourist_type, festival):
@@ -91,54 +89,154 @@ def generate_avg_stay(destination_type, tourist_type):
     if destination_type == "Pilgrimage": base *= 1.1
     return round(max(1.0, min(10.0, random.gauss(base, 1.2))), 1)
 
+# Column storage of the loop engine's RecordBuffer (Revenue_Cr reaches six figures
+# with two decimals, more than float32 holds exactly, so it stays float64)
+COLUMN_TYPES = {
+    "Record_ID": "int64", "Year": "int16", "Date": "datetime64[s]", "Time_Period": CATEGORY,
+    "Region": CATEGORY, "District": CATEGORY, "Tourist_Type": CATEGORY,
+    "Destination_Type": CATEGORY, "Season": CATEGORY, "Tourist_Footfall": "int32",
+    "Average_Stay_Days": "float32", "Festival_Season": CATEGORY, "Revenue_Cr": "float64",
+    "Hotels_Registered": "int32", "Employment_Generated": "int32"
+}
+COLUMNS = list(COLUMN_TYPES)
+
 # ----------------------------
 # Generate Dataset
 # ----------------------------
-rows = []
-for i in range(1, NUM_ROWS + 1):
-    year = random.choice(YEARS)
-    date_val = random_date_in_year(year)
-    time_period = get_time_period(year)
-    region = random.choice(list(regions_districts.keys()))
-    district = random.choice(regions_districts[region])
-
-    # Tourist type (80% Domestic, 20% International; Ladakh gets more foreign visitors)
-    if region == "Ladakh":
-        tourist_type = np.random.choice(tourist_types, p=[0.6, 0.4])
-    else:
-        tourist_type = np.random.choice(tourist_types, p=[0.8, 0.2])
-
-    destination_type = random.choice(destination_types)
-    season = month_to_season(date_val.month)
-
-    tourist_footfall = generate_footfall(region, destination_type, year)
-    avg_stay_days = generate_avg_stay(destination_type, tourist_type)
-    festival_season = "Yes" if is_festival_season(season, destination_type) else "No"
-    revenue_cr = estimate_revenue_crore(tourist_footfall, avg_stay_days, tourist_type, festival_season)
-    hotels_registered = estimate_hotels(tourist_footfall)
-    employment_generated = estimate_employment(hotels_registered, tourist_footfall)
-
-    rows.append({
-        "Record_ID": i,
+def generate_loop(num_rows, start_id=1, years=YEARS, regions_districts=regions_districts):
+    region_names = list(regions_districts)
+    clock = profiling.clock("loop", num_rows)
+    buffer = RecordBuffer(COLUMN_TYPES, num_rows)
+    for i in range(start_id, start_id + num_rows):
+        year = random.choice(years)
+        date_val = random_date_in_year(year)
+        time_period = get_time_period(year)
+        region = random.choice(region_names)
+        district = random.choice(regions_districts[region])
+
+        # Tourist type (80% Domestic, 20% International; Ladakh gets more foreign visitors)
+        if region == "Ladakh":
+            tourist_type = np.random.choice(tourist_types, p=[0.6, 0.4])
+        else:
+            tourist_type = np.random.choice(tourist_types, p=[0.8, 0.2])
+
+        destination_type = random.choice(destination_types)
+        season = month_to_season(date_val.month)
+
+        tourist_footfall = generate_footfall(region, destination_type, year)
+        avg_stay_days = generate_avg_stay(destination_type, tourist_type)
+        festival_season = "Yes" if is_festival_season(season, destination_type) else "No"
+        revenue_cr = estimate_revenue_crore(tourist_footfall, avg_stay_days, tourist_type, festival_season)
+        hotels_registered = estimate_hotels(tourist_footfall)
+        employment_generated = estimate_employment(hotels_registered, tourist_footfall)
+
+        buffer.append(
+            i, year, date_val, time_period, region, district, tourist_type, destination_type,
+            season, tourist_footfall, avg_stay_days, festival_season, revenue_cr, hotels_registered,
+            employment_generated
+        )
+    clock.lap("rows")
+    df = buffer.to_frame()
+    clock.lap("frame")
+    return df
+
+# ----------------------------
+# Batch engine (column-at-a-time)
+# ----------------------------
+DESTINATION_SAMPLER = uniform_table(len(destination_types))
+# Domestic/International split per region (Ladakh gets more foreign visitors)
+TOURIST_TYPE_SAMPLER = AliasTable([[0.6, 0.4] if r == "Ladakh" else [0.8, 0.2] for r in REGIONS])
+FOOTFALL_RANGE = np.array([[footfall_range(r, d) for d in destination_types] for r in REGIONS])
+
+# `footfall_growth_per_year` can be varied per scenario (see scenarios.py)
+def generate_batch(num_rows, rng, start_id=1, years=YEARS, regions_districts=regions_districts,
+                   footfall_growth_per_year=FOOTFALL_GROWTH_PER_YEAR):
+    import pandas as pd
+
+    n = num_rows
+    clock = profiling.clock("batch", n)
+    calendar = get_calendar(years)
+    day = calendar.sample_days(rng, n)
+    year = calendar.year[day]
+    date_val = calendar.date[day]
+    locations = location_choice(regions_districts, REGIONS)
+    region_code, district_code = locations.sample(rng, n)
+    international = TOURIST_TYPE_SAMPLER.sample(rng, n, given=region_code) == 1
+    destination_code = DESTINATION_SAMPLER.sample(rng, n)
+    season_code = calendar.season[day]
+    is_adventure = destination_code == destination_types.index("Adventure")
+    is_pilgrimage = destination_code == destination_types.index("Pilgrimage")
+
+    clock.lap("sample")
+
+    # Footfall: range by region × destination, yearly growth since BASE_YEAR
+    low = FOOTFALL_RANGE[region_code, destination_code, 0]
+    high = FOOTFALL_RANGE[region_code, destination_code, 1]
+    growth_factor = 1 + (year - BASE_YEAR) * footfall_growth_per_year
+    tourist_footfall = (rng.integers(low, high + 1) * growth_factor).astype(np.int64)
+
+    # Average stay
+    base = np.where(international, rng.uniform(4, 8, n), rng.uniform(1, 6, n))
+    base = base * np.where(is_adventure, 0.9, 1.0) * np.where(is_pilgrimage, 1.1, 1.0)
+    avg_stay_days = np.round(np.clip(rng.normal(base, 1.2, n), 1.0, 10.0), 1)
+
+    # Festival season
+    peak_season = (season_code == SEASONS.index("Summer")) | (season_code == SEASONS.index("Winter"))
+    festival_prob = 0.08 + np.where(peak_season, 0.12, 0.0)
+    festival_prob = np.minimum(festival_prob + np.where(is_pilgrimage, 0.10, 0.0), 0.9)
+    festival = rng.random(n) < festival_prob
+
+    # Revenue
+    per_tourist = np.where(international, rng.uniform(0.02, 0.08, n), rng.uniform(0.002, 0.02, n))
+    revenue = tourist_footfall * per_tourist * (avg_stay_days / 3.0) * rng.uniform(0.85, 1.25, n)
+    revenue = np.where(festival, revenue * 1.2, revenue)
+    revenue_cr = np.round(np.maximum(0.01, revenue), 2)
+
+    # Hotels & employment
+    hotel_base = np.clip(tourist_footfall // 250, 10, 2000)
+    hotels_registered = np.maximum(1, np.trunc(rng.normal(hotel_base, hotel_base * 0.25, n))).astype(np.int64)
+    direct = hotels_registered * rng.integers(5, 26, n)
+    indirect = (tourist_footfall * rng.uniform(0.0005, 0.005, n)).astype(np.int64)
+    employment_generated = np.maximum(10, direct + indirect)
+
+    clock.lap("derive")
+    df = pd.DataFrame({
+        "Record_ID": np.arange(start_id, start_id + n),
         "Year": year,
-        "Date": date_val.isoformat(),
-        "Time_Period": time_period,
-        "Region": region,
-        "District": district,
-        "Tourist_Type": tourist_type,
-        "Destination_Type": destination_type,
-        "Season": season,
+        "Date": date_val,
+        "Time_Period": np.asarray(TIME_PERIODS, dtype=object)[time_period_codes(year, 2025)],
+        "Region": np.asarray(REGIONS, dtype=object)[region_code],
+        "District": np.asarray(locations.values, dtype=object)[district_code],
+        "Tourist_Type": np.where(international, "International", "Domestic").astype(object),
+        "Destination_Type": np.asarray(destination_types, dtype=object)[destination_code],
+        "Season": np.asarray(SEASONS, dtype=object)[season_code],
         "Tourist_Footfall": tourist_footfall,
         "Average_Stay_Days": avg_stay_days,
-        "Festival_Season": festival_season,
+        "Festival_Season": np.where(festival, "Yes", "No").astype(object),
         "Revenue_Cr": revenue_cr,
         "Hotels_Registered": hotels_registered,
         "Employment_Generated": employment_generated
-    })
+    }, columns=COLUMNS)
+    clock.lap("frame")
+    return df
+
+# Stream the dataset in chunks; Record_ID keeps counting across chunks
+# (`years` / `regions_districts` restrict the batch engines to part of the catalog)
+def iter_chunks(num_rows, chunk_size=CHUNK_SIZE, start_id=1, seed=None, mode="loop", years=None,
+                regions_districts=None):
+    batch = bind_batch_options(generate_batch, mode, years=years, regions_districts=regions_districts)
+    return stream_chunks(SECTOR, generate_loop, batch, num_rows, chunk_size, start_id, seed, mode)
 
 # ----------------------------
 # Save to CSV
 # ----------------------------
-df = pd.DataFrame(rows)
-df.to_csv("travel.csv", index=False)
-print("✅ travel.csv generated with", len(df), "rows and", len(df.columns), "columns.")
+if __name__ == "__main__":
+    args = build_parser("Generate the synthetic travel & tourism dataset.", NUM_ROWS,
+                        "travel.csv", default_seed=42).parse_args()
+    total = run_sector("Travel", args.rows, args.output, args.seed, args.chunk_size,
+                       args.shards, args.processes, fmt=args.format, start_id=args.start_id,
+                       mode=args.mode, **output_options(args))
+    if not args.no_raw:
+        print("✅", args.output, "generated with", total, "rows and", len(COLUMNS), "columns.")
+    if args.rollup:
+        print("✅ Rollup cube written to", args.rollup)
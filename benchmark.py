@@ -0,0 +1,157 @@
+"""Benchmark the sector generators: rows/sec, peak RSS and output size.
+
+Each (sector, size) case runs in a freshly spawned process so peak RSS is
+not polluted by earlier cases. Time is split between generation (producing
+DataFrame chunks) and serialization (the writer), and results are written
+as JSON so runs can be compared over time:
+
+    python benchmark.py --sizes 10000 100000 --output bench.json
+    python benchmark.py --sizes 10000 100000 --baseline bench.json
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from common import CHUNK_SIZE, MODES, SECTORS
+from writers import FORMATS, WRITERS, with_format_suffix
+
+DEFAULT_SIZES = [10000, 100000, 1000000, 10000000]
+
+# Rows/sec drop (vs. the baseline file) reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+def _timed(chunks, timings):
+    """Pass chunks through, adding the time spent producing them to timings["generate"]."""
+    chunks = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            df = next(chunks)
+        except StopIteration:
+            return
+        timings["generate"] += time.perf_counter() - start
+        yield df
+
+
+def _path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def _run_case(sector, num_rows, fmt, mode, chunk_size, seed, work_dir):
+    module_name, default_output = SECTORS[sector]
+    module = importlib.import_module(module_name)
+    output = os.path.join(work_dir, with_format_suffix(default_output, fmt))
+    # The engines and writers import these lazily; load them before the clock starts
+    importlib.import_module("pandas")
+    if fmt == "parquet":
+        importlib.import_module("pyarrow")
+
+    timings = {"generate": 0.0}
+    start = time.perf_counter()
+    total = WRITERS[fmt](_timed(module.iter_chunks(num_rows, chunk_size, seed=seed, mode=mode), timings), output)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sector": sector,
+        "rows": total,
+        "format": fmt,
+        "mode": mode,
+        "chunk_size": chunk_size,
+        "seconds": round(elapsed, 4),
+        "generate_seconds": round(timings["generate"], 4),
+        "write_seconds": round(elapsed - timings["generate"], 4),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "output_bytes": _path_size(output),
+    }
+
+
+def run_benchmarks(sectors, sizes, fmt="csv", mode="loop", chunk_size=CHUNK_SIZE, seed=42):
+    """Run every (sector, size) case in its own process and return the result records."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for sector in sectors:
+        for num_rows in sizes:
+            work_dir = tempfile.mkdtemp(prefix="jkl-bench-")
+            try:
+                case = (sector, num_rows, fmt, mode, chunk_size, seed, work_dir)
+                with context.Pool(1) as pool:
+                    record = pool.apply(_run_case, case)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            print(f"{sector:<12}{mode:<6}{record['rows']:>12,}{record['rows_per_sec']:>14,.0f} rows/s"
+                  f"  gen {record['generate_seconds']:>8.2f}s  write {record['write_seconds']:>8.2f}s"
+                  f"  rss {record['peak_rss_mb']:>8.1f} MB  out {record['output_bytes']:>14,} B")
+            results.append(record)
+    return results
+
+
+def compare_to_baseline(results, baseline_results, threshold=REGRESSION_THRESHOLD):
+    """Return the cases whose rows/sec fell by more than `threshold` vs the baseline.
+
+    Each regression is (sector, rows, format, mode, before, after, change).
+    """
+    key = lambda r: (r["sector"], r["rows"], r["format"], r.get("mode", "loop"))
+    baseline = {key(r): r for r in baseline_results}
+    regressions = []
+    for record in results:
+        before = baseline.get(key(record))
+        if not before or not before["rows_per_sec"] or not record["rows_per_sec"]:
+            continue
+        change = record["rows_per_sec"] / before["rows_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((*key(record), before["rows_per_sec"], record["rows_per_sec"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JKL 360 sector generators.")
+    parser.add_argument("--sectors", nargs="+", choices=list(SECTORS), default=list(SECTORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["loop", "batch"])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--baseline", default=None,
+                        help="earlier results file to check for rows/sec regressions")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        results += run_benchmarks(args.sectors, args.sizes, args.format, mode, args.chunk_size, args.seed)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("✅ Benchmark results written to", args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f)["results"])
+        for sector, rows, fmt, mode, before, after, change in regressions:
+            print(f"⚠️ {sector} @ {rows:,} rows ({mode}, {fmt}): {before:,.0f} -> {after:,.0f} rows/sec "
+                  f"({change:+.1%})")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
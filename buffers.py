@@ -0,0 +1,115 @@
+"""Typed struct-of-arrays storage for the row-by-row (loop) engines.
+
+    buffer = RecordBuffer({"Record_ID": "int64", "Date": "datetime64[s]",
+                           "Region": CATEGORY, "Revenue_Cr": "float32"}, num_rows)
+    buffer.append(1, date(2024, 2, 27), "Jammu", 998.53)
+    df = buffer.to_frame()
+
+Each column is one preallocated NumPy array, so a row costs its packed
+values (a few dozen bytes) instead of a dict of boxed Python objects, and
+to_frame() wraps the arrays without copying them. String columns are
+stored as int16 codes into a dictionary grown as values appear.
+"""
+from datetime import date
+
+import numpy as np
+
+# Column type for strings stored as codes (a pandas Categorical in the frame)
+CATEGORY = "category"
+CODE_DTYPE = np.dtype(np.int16)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Largest number of decimals tried when widening float32 values
+_MAX_DECIMALS = 9
+
+
+class RecordBuffer:
+    """`size` rows of the columns in `columns` ({name: NumPy dtype or CATEGORY}), filled row by row.
+
+    Values are written through memoryviews of the arrays, which is about
+    twice as fast as NumPy item assignment. datetime64 columns take
+    datetime.date values.
+    """
+
+    def __init__(self, columns, size):
+        self.names = list(columns)
+        self.size = size
+        self.count = 0
+        self._arrays = []
+        # Per column: None (plain value), {value: code} (CATEGORY) or datetime64 units per day
+        self._encodings = []
+        for dtype in columns.values():
+            if dtype == CATEGORY:
+                array, encoding = np.empty(size, dtype=CODE_DTYPE), {}
+            elif np.dtype(dtype).kind == "M":
+                array = np.empty(size, dtype=dtype)
+                encoding = int(np.timedelta64(1, "D") / np.timedelta64(1, np.datetime_data(array.dtype)[0]))
+            else:
+                array, encoding = np.empty(size, dtype=dtype), None
+            self._arrays.append(array)
+            self._encodings.append(encoding)
+        self._views = [memoryview(array.view(np.int64) if array.dtype.kind == "M" else array)
+                       for array in self._arrays]
+
+    def append(self, *values):
+        """Add one row; `values` are in column order."""
+        row = self.count
+        if row == self.size:
+            raise IndexError(f"RecordBuffer is full ({self.size} rows)")
+        for view, encoding, value in zip(self._views, self._encodings, values):
+            if encoding is None:
+                view[row] = value
+            elif encoding.__class__ is dict:
+                code = encoding.get(value)
+                if code is None:
+                    code = encoding[value] = len(encoding)
+                view[row] = code
+            else:
+                view[row] = (value.toordinal() - _EPOCH_ORDINAL) * encoding
+        self.count = row + 1
+
+    def to_frame(self):
+        """The rows so far as a DataFrame backed by the buffer's arrays.
+
+        String columns become Categoricals; their codes are renumbered in
+        place so the categories are sorted, as they would be for plain strings.
+        """
+        import pandas as pd
+
+        data = {}
+        for name, array, codes in zip(self.names, self._arrays, self._encodings):
+            values = array[:self.count]
+            if codes.__class__ is dict:
+                categories = sorted(codes)
+                order = np.empty(len(codes), dtype=CODE_DTYPE)
+                order[[codes[value] for value in categories]] = np.arange(len(codes), dtype=CODE_DTYPE)
+                values[:] = order[values]
+                codes.update((value, code) for code, value in enumerate(categories))
+                values = pd.Categorical.from_codes(values, categories, validate=False)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def widen_float32(values):
+    """float64 copy of float32 `values`, each the shortest decimal that maps back to it.
+
+    A plain cast turns 21.6f into 21.600000381469727; sums and exports
+    of rounded measures should see 21.6.
+    """
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        return values.astype(np.float64)
+    exact = values.astype(np.float64)
+    widened = exact.copy()
+    pending = np.isfinite(values)
+    for decimals in range(_MAX_DECIMALS + 1):
+        if not pending.any():
+            break
+        scale = 10.0 ** decimals
+        candidate = np.rint(exact[pending] * scale) / scale
+        matched = candidate.astype(np.float32) == values[pending]
+        index = np.flatnonzero(pending)[matched]
+        widened[index] = candidate[matched]
+        pending[index] = False
+    return widened
@@ -0,0 +1,156 @@
+"""Shared helpers for the sector generators."""
+import argparse
+import random
+from functools import partial
+
+import numpy as np
+
+from counter_rng import RowStreams
+from writers import COMPRESSIONS, FORMATS, check_output, with_format_suffix
+
+# Rows generated (and held in memory) per chunk
+CHUNK_SIZE = 100000
+
+# Row-by-row reference engine, vectorized column-at-a-time engine, or the
+# batch engine on counter-based streams (rows reproducible by Record_ID alone)
+MODES = ("loop", "batch", "counter")
+
+# Sector name -> (generator module, default output file)
+SECTORS = {
+    "agriculture": ("Agriculture", "agriculture.csv"),
+    "climate": ("Climate", "climate.csv"),
+    "handicrafts": ("Handicrafts", "industry_handicrafts.csv"),
+    "trade": ("Trade", "trade_commerce.csv"),
+    "travel": ("Travel", "travel.csv"),
+}
+
+
+def chunk_bounds(num_rows, chunk_size=CHUNK_SIZE, start_id=1):
+    """Yield (first Record_ID, row count) for each chunk of a run."""
+    end = start_id + num_rows
+    for first in range(start_id, end, chunk_size):
+        yield first, min(chunk_size, end - first)
+
+
+def seed_global_rngs(seed):
+    """Seed the `random` and legacy NumPy global generators used by the loop engines."""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def stream_chunks(sector, generate_loop, generate_batch, num_rows, chunk_size=CHUNK_SIZE, start_id=1,
+                  seed=None, mode="loop"):
+    """Yield one DataFrame per chunk from a sector's loop or batch engine.
+
+    The batch engine draws from a single `np.random.Generator` for the whole
+    run, or from per-row counter streams in "counter" mode; the loop engine
+    uses the seeded global generators. An empty run yields one empty chunk,
+    so the writers still see the columns (a CSV gets its header).
+    """
+    bounds = list(chunk_bounds(num_rows, chunk_size, start_id)) if num_rows else [(start_id, 0)]
+    if mode == "counter":
+        for first_id, n in bounds:
+            yield generate_batch(n, RowStreams(seed, sector, first_id, n), first_id)
+    elif mode == "batch":
+        rng = np.random.default_rng(seed)
+        for first_id, n in bounds:
+            yield generate_batch(n, rng, first_id)
+    else:
+        if seed is not None:
+            seed_global_rngs(seed)
+        for first_id, n in bounds:
+            yield generate_loop(n, first_id)
+
+
+def bind_batch_options(generate_batch, mode, **options):
+    """`generate_batch` with the given keyword options bound (those that are not None).
+
+    Such options (a catalog subset, the shared climate grid) only exist in
+    the batch engines, so asking for them in loop mode is an error.
+    """
+    options = {name: value for name, value in options.items() if value is not None}
+    if not options:
+        return generate_batch
+    if mode == "loop":
+        raise ValueError(f"{', '.join(options)} only apply to the batch and counter engines")
+    return partial(generate_batch, **options)
+
+
+def output_options(args):
+    """run_sector keyword arguments for the output options parsed by build_parser."""
+    return {"rollup": args.rollup, "raw": not args.no_raw, "compression": args.compression,
+            "pipeline": args.pipeline, "profile": args.profile, "cprofile": args.cprofile}
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1 (--chunk-size, --shards)."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def non_negative_int(value):
+    """argparse type for counts that may be 0 (--rows 0 writes just the header)."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+class _SectorParser(argparse.ArgumentParser):
+    """Fills in the output path from the sector default and the chosen format."""
+
+    def parse_args(self, args=None, namespace=None):
+        parsed = super().parse_args(args, namespace)
+        if parsed.compression and parsed.format != "csv":
+            self.error("--compression applies to --format csv only")
+        if parsed.output is None:
+            parsed.output = with_format_suffix(self.default_output, parsed.format)
+            if parsed.compression:
+                parsed.output += COMPRESSIONS[parsed.compression]
+        if parsed.no_raw and parsed.rollup is None:
+            self.error("--no-raw needs --rollup")
+        try:
+            check_output(parsed.output, parsed.format)
+        except ValueError as exc:
+            self.error(str(exc))
+        return parsed
+
+
+def build_parser(description, default_rows, default_output, default_seed=None):
+    """Command-line options shared by every sector script."""
+    parser = _SectorParser(description=description)
+    parser.default_output = default_output
+    parser.add_argument("--rows", type=non_negative_int, default=default_rows, help="number of rows to generate")
+    parser.add_argument("--chunk-size", type=positive_int, default=CHUNK_SIZE,
+                        help="rows generated and written per chunk (bounds peak memory)")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="csv file, Parquet dataset partitioned by Year/Region, or directory of "
+                             "memory-mappable .npy columns")
+    parser.add_argument("--output", default=None,
+                        help=f"output path (default: {default_output} with the format's extension)")
+    parser.add_argument("--seed", type=int, default=default_seed, help="master random seed")
+    parser.add_argument("--mode", choices=MODES, default="loop",
+                        help="row-by-row loop engine, vectorized batch engine, or batch engine on "
+                             "counter-based streams")
+    parser.add_argument("--start-id", type=int, default=1,
+                        help="first Record_ID (with --mode counter, regenerates exactly that ID range)")
+    parser.add_argument("--shards", type=positive_int, default=1,
+                        help="split the run across this many worker processes")
+    parser.add_argument("--processes", type=positive_int, default=None,
+                        help="size of the worker pool (default: one per CPU)")
+    parser.add_argument("--compression", choices=list(COMPRESSIONS), default=None,
+                        help="compress CSV output (written on a background thread, see --pipeline)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="write CSV on a background thread while the next chunks are generated")
+    parser.add_argument("--rollup", default=None, metavar="PATH",
+                        help="also write the KPI rollup cube (Year × Region × District × category) as CSV")
+    parser.add_argument("--no-raw", action="store_true",
+                        help="with --rollup, skip writing the raw rows")
+    parser.add_argument("--profile", default=None, metavar="PATH",
+                        help="time each stage (sampling, derived measures, DataFrame build, writing) "
+                             "and write the summary as JSON")
+    parser.add_argument("--cprofile", default=None, metavar="PATH",
+                        help="also run cProfile and dump its stats here (readable with pstats)")
+    return parser
@@ -0,0 +1,69 @@
+"""Counter-based random streams for random access to any Record_ID.
+
+With a sequential generator, row N can only be reproduced by regenerating
+rows 1..N-1. `RowStreams` instead gives every column its own Philox stream
+keyed by (seed, sector, column) and reads it at counter position
+Record_ID - 1, so each value is a pure function of
+(seed, sector, Record_ID): any ID range can be regenerated on its own, and
+chunked or sharded runs match a serial run exactly.
+"""
+import zlib
+
+import numpy as np
+
+# Philox produces four 64-bit outputs per counter step
+_OUTPUTS_PER_STEP = 4
+
+
+class RowStreams:
+    """Stand-in for the `np.random.Generator` methods used by the batch engines.
+
+    Every draw is one column: it must return exactly one value per row of
+    the chunk. The k-th draw of a chunk always reads column stream k, so the
+    batch engines have to draw their columns in a fixed order, which they do.
+    """
+
+    def __init__(self, seed, sector, first_id, num_rows):
+        if seed is None:
+            raise ValueError("counter mode needs an explicit seed")
+        self.seed = seed
+        self.sector_key = zlib.crc32(sector.encode())
+        self.first_id = first_id
+        self.num_rows = num_rows
+        self._column = 0
+
+    def _uniforms(self, size):
+        if size is None or np.prod(size) != self.num_rows:
+            raise ValueError(f"counter streams draw one value per row ({self.num_rows}), got size {size}")
+        key = np.random.SeedSequence([self.seed, self.sector_key, self._column]).generate_state(2, np.uint64)
+        self._column += 1
+        bit_generator = np.random.Philox(key=key)
+        position = self.first_id - 1
+        bit_generator.advance(position // _OUTPUTS_PER_STEP)
+        bit_generator.random_raw(position % _OUTPUTS_PER_STEP)
+        return np.random.Generator(bit_generator).random(self.num_rows)
+
+    @staticmethod
+    def _size(size, *params):
+        return size if size is not None else np.broadcast(*params).shape
+
+    def random(self, size=None):
+        return self._uniforms(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        u = self._uniforms(self._size(size, low, high))
+        return low + (high - low) * u
+
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        u = self._uniforms(self._size(size, low, high))
+        span = np.asarray(high, dtype=np.int64) - low
+        return low + np.minimum((u * span).astype(np.int64), span - 1)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        # Box-Muller from two columns: a fixed number of uniforms per row
+        size = self._size(size, loc, scale)
+        u1, u2 = self._uniforms(size), self._uniforms(size)
+        z = np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2.0 * np.pi * u2)
+        return loc + scale * z
@@ -0,0 +1,39 @@
+"""In-memory access to the synthetic datasets, without writing files.
+
+    from dataset import iter_batches
+
+    for batch in iter_batches("travel", 5_000_000, batch_size=250_000, seed=7):
+        ...  # a pandas DataFrame; stop early at any point
+
+Batches are generated only when requested, so breaking out of the loop
+costs nothing for the rows that were never reached.
+"""
+import importlib
+
+from common import CHUNK_SIZE, SECTORS
+from writers import to_columnar
+
+
+def iter_batches(sector, n_rows, batch_size=CHUNK_SIZE, seed=None, mode="batch", start_id=1,
+                 as_arrow=False, **options):
+    """Lazily yield `n_rows` rows of `sector` in batches of `batch_size`.
+
+    Batches are pandas DataFrames, or `pyarrow.RecordBatch`es (dictionary-
+    encoded strings, typed dates) when `as_arrow` is true. `mode` selects
+    the engine as on the command line: "batch" (default), "counter" or "loop";
+    other options (e.g. `climate_grid`) go to the sector's `iter_chunks`.
+    """
+    if sector not in SECTORS:
+        raise ValueError(f"unknown sector {sector!r}; expected one of {', '.join(SECTORS)}")
+    module = importlib.import_module(SECTORS[sector][0])
+    chunks = module.iter_chunks(n_rows, batch_size, start_id, seed=seed, mode=mode, **options)
+    if not as_arrow:
+        yield from chunks
+        return
+
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("Arrow batches need pyarrow: pip install pyarrow") from exc
+    for df in chunks:
+        yield pa.RecordBatch.from_pandas(to_columnar(df), preserve_index=False)
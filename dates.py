@@ -0,0 +1,85 @@
+"""Date sampling and calendar lookups shared by the sector generators.
+
+The batch engines sample a day index into a per-day table covering the
+configured years, then read Year, Date, Month and both season schemes from
+that table in one indexed pass. Leap years come for free because the table
+is built from real datetime64[D] ranges.
+"""
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+TIME_PERIODS = ["Past", "Present"]
+
+# Summer/Monsoon/Autumn/Winter/Spring scheme used by Climate and Travel
+SEASONS = ["Summer", "Monsoon", "Autumn", "Winter", "Spring"]
+SEASON_BY_MONTH = [None, "Winter", "Winter", "Spring", "Summer", "Summer", "Summer",
+                   "Monsoon", "Monsoon", "Monsoon", "Autumn", "Autumn", "Winter"]
+
+# Kharif/Rabi/Zaid cropping seasons used by Agriculture
+CROP_SEASONS = ["Kharif", "Rabi", "Zaid"]
+CROP_SEASON_BY_MONTH = [None, "Rabi", "Rabi", "Rabi", "Rabi", "Zaid", "Kharif",
+                        "Kharif", "Kharif", "Kharif", "Kharif", "Rabi", "Rabi"]
+
+
+def month_to_season(month):
+    return SEASON_BY_MONTH[month] if 1 <= month <= 12 else "Unknown"
+
+
+def month_to_crop_season(month):
+    return CROP_SEASON_BY_MONTH[month] if 1 <= month <= 12 else "Unknown"
+
+
+def random_date_in_year(year):
+    """Scalar sampler used by the loop engines (stdlib `random`)."""
+    start, end = datetime(year, 1, 1), datetime(year, 12, 31)
+    return (start + timedelta(days=random.randint(0, (end - start).days))).date()
+
+
+def time_period_codes(years, present_from):
+    """Codes into TIME_PERIODS: years before `present_from` are "Past"."""
+    return (np.asarray(years) >= present_from).astype(np.int8)
+
+
+class DayCalendar:
+    """Per-day lookup table for a list of years.
+
+    `day` arrays index `date`, `year`, `month`, `season` and `crop_season`
+    (season columns hold codes into SEASONS / CROP_SEASONS).
+    """
+
+    def __init__(self, years):
+        self.years = np.asarray(sorted(years))
+        year_start = (self.years - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+        year_end = (self.years - 1969).astype("datetime64[Y]").astype("datetime64[D]")
+        self.year_length = (year_end - year_start).astype(np.int64)
+        self.year_offset = np.concatenate(([0], np.cumsum(self.year_length)[:-1]))
+
+        self.date = np.concatenate([np.arange(s, e) for s, e in zip(year_start, year_end)])
+        self.year = np.repeat(self.years, self.year_length).astype(np.int16)
+        self.month = (self.date.astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int8)
+        season_by_month = np.array([0] + [SEASONS.index(s) for s in SEASON_BY_MONTH[1:]], dtype=np.int8)
+        crop_by_month = np.array([0] + [CROP_SEASONS.index(s) for s in CROP_SEASON_BY_MONTH[1:]],
+                                 dtype=np.int8)
+        self.season = season_by_month[self.month]
+        self.crop_season = crop_by_month[self.month]
+
+    def sample(self, rng, year_index):
+        """One uniformly random day within each year of `year_index` (positions in `years`)."""
+        return self.year_offset[year_index] + rng.integers(0, self.year_length[year_index])
+
+    def sample_days(self, rng, size):
+        """Uniform year (as the loop engines' `random.choice(YEARS)`), then a uniform day in it."""
+        return self.sample(rng, rng.integers(0, len(self.years), size))
+
+
+@lru_cache(maxsize=None)
+def _calendar(years):
+    return DayCalendar(years)
+
+
+def get_calendar(years):
+    """Shared, cached DayCalendar for `years`."""
+    return _calendar(tuple(sorted(years)))
@@ -0,0 +1,249 @@
+"""Extend an existing sector dataset with new years or districts only.
+
+    python incremental.py travel --add-years 2026
+    python incremental.py travel --add-district Ladakh=Hanle Ladakh=Chushul
+
+Existing rows are never rewritten: a CSV is appended to in place and a
+Parquet dataset gains new files. Record_IDs continue from the current
+maximum. A sidecar `<output>.meta.json` records the years and districts the
+output covers and every run that extended it, so repeating a run finds
+nothing new and does nothing. It also records the CSV size (or Parquet
+file count) after the last committed run, and is written before the first
+row of a run is appended, so a run interrupted halfway, even the first one,
+is rolled back before the retry.
+"""
+import argparse
+import glob
+import importlib
+import itertools
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from common import CHUNK_SIZE, SECTORS
+from writers import with_format_suffix, write_csv, write_parquet
+
+# The batch engines are the ones that take `years` / `regions_districts`
+INCREMENTAL_MODES = ("batch", "counter")
+# Formats that can grow without rewriting what is already there
+INCREMENTAL_FORMATS = ("csv", "parquet")
+
+SCAN_COLUMNS = ["Record_ID", "Year", "Region", "District"]
+
+
+def metadata_path(output):
+    return output.rstrip("/\\") + ".meta.json"
+
+
+def _coverage(rows, max_record_id, years, pairs):
+    regions_districts = {}
+    for region, district in sorted(pairs):
+        regions_districts.setdefault(region, []).append(district)
+    return {
+        "rows": int(rows),
+        "max_record_id": int(max_record_id),
+        "years": sorted(int(year) for year in years),
+        "regions_districts": regions_districts,
+    }
+
+
+def scan_output(output, fmt):
+    """Rebuild coverage (row count, max Record_ID, years, districts) from the data itself."""
+    rows, max_id, years, pairs = 0, 0, set(), set()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        chunks = [pq.read_table(output, columns=SCAN_COLUMNS).to_pandas()]
+    else:
+        chunks = pd.read_csv(output, usecols=SCAN_COLUMNS, chunksize=CHUNK_SIZE)
+    for df in chunks:
+        rows += len(df)
+        max_id = max(max_id, int(df["Record_ID"].max()))
+        years.update(df["Year"].astype(int).unique())
+        pairs.update(zip(df["Region"].astype(str), df["District"].astype(str)))
+    return _coverage(rows, max_id, years, pairs)
+
+
+def _parquet_files(output):
+    return glob.glob(os.path.join(output, "**", "*.parquet"), recursive=True)
+
+
+def _size_fields(output, fmt):
+    """What _discard_partial_run checks the output against: CSV bytes or Parquet file count."""
+    if fmt == "csv":
+        return {"bytes": os.path.getsize(output)}
+    return {"files": len(_parquet_files(output))}
+
+
+def load_metadata(sector, output, fmt):
+    """Read the sidecar, or build one by scanning an output that has none yet."""
+    if not os.path.exists(output):
+        raise FileNotFoundError(f"{output} does not exist; generate the base dataset first")
+    path = metadata_path(output)
+    if os.path.exists(path):
+        with open(path) as f:
+            meta = json.load(f)
+        if meta["sector"] != sector or meta["format"] != fmt:
+            raise ValueError(f"{path} describes a {meta['format']} {meta['sector']} dataset")
+        return meta
+    return {"sector": sector, "format": fmt, **scan_output(output, fmt), **_size_fields(output, fmt), "runs": []}
+
+
+def save_metadata(output, meta):
+    path = metadata_path(output)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _run_prefix(run_index):
+    return f"inc{run_index:05d}"
+
+
+def _discard_partial_run(output, fmt, meta):
+    """Undo whatever an interrupted run left behind after the last committed run."""
+    if fmt == "csv":
+        size = os.path.getsize(output)
+        if size < meta["bytes"]:
+            raise ValueError(f"{output} is smaller than recorded in {metadata_path(output)}; "
+                             "it was changed outside incremental runs")
+        if size > meta["bytes"]:
+            with open(output, "r+b") as f:
+                f.truncate(meta["bytes"])
+    else:
+        pattern = os.path.join(output, "**", f"{_run_prefix(len(meta['runs']))}-*.parquet")
+        for path in glob.glob(pattern, recursive=True):
+            os.remove(path)
+        if len(_parquet_files(output)) != meta.get("files", len(_parquet_files(output))):
+            raise ValueError(f"{output} does not have the files recorded in {metadata_path(output)}; "
+                             "it was changed outside incremental runs")
+
+
+def plan_delta(meta, add_years=(), add_districts=None):
+    """Split what is not yet covered into (years, regions_districts) slices.
+
+    New years are generated for every district (old and new); new districts
+    are additionally generated for the years already covered.
+    """
+    covered = meta["regions_districts"]
+    new_years = sorted(set(add_years) - set(meta["years"]))
+    new_districts = {}
+    for region, names in (add_districts or {}).items():
+        fresh = [name for name in dict.fromkeys(names) if name not in covered.get(region, [])]
+        if fresh:
+            new_districts[region] = fresh
+
+    slices = []
+    if new_years:
+        catalog = {region: list(names) for region, names in covered.items()}
+        for region, names in new_districts.items():
+            catalog.setdefault(region, []).extend(names)
+        slices.append((new_years, catalog))
+    if new_districts and meta["years"]:
+        slices.append((list(meta["years"]), new_districts))
+    return slices
+
+
+def _slice_seed(seed, run_index, slice_index):
+    """Fresh batch-engine seed per run and slice, so a delta does not replay earlier draws.
+
+    Counter mode needs none: its streams are keyed by Record_ID, which is new anyway.
+    """
+    return int(np.random.SeedSequence([seed, run_index, slice_index]).generate_state(1)[0])
+
+
+def _cells(years, regions_districts):
+    return len(years) * sum(len(names) for names in regions_districts.values())
+
+
+def extend(sector, output, fmt="csv", add_years=(), add_districts=None, seed=42, mode="batch",
+           chunk_size=CHUNK_SIZE, rows_per_cell=None):
+    """Append rows for new years / districts to `output`. Returns the rows appended (0 if up to date).
+
+    Each (year, district) cell gets `rows_per_cell` rows on average, by
+    default the density of the existing output.
+    """
+    if mode not in INCREMENTAL_MODES:
+        raise ValueError(f"incremental runs need one of the batch engines {INCREMENTAL_MODES}")
+    meta = load_metadata(sector, output, fmt)
+    _discard_partial_run(output, fmt, meta)
+    slices = plan_delta(meta, add_years, add_districts)
+    if not slices:
+        return 0
+
+    if rows_per_cell is None:
+        rows_per_cell = meta["rows"] / max(_cells(meta["years"], meta["regions_districts"]), 1)
+    run_index = len(meta["runs"])
+    if not os.path.exists(metadata_path(output)):
+        # Record the committed state before appending, so an interrupted first run can be rolled back
+        save_metadata(output, meta)
+
+    module = importlib.import_module(SECTORS[sector][0])
+    first_id = meta["max_record_id"] + 1
+    streams, next_id = [], first_id
+    for index, (years, regions_districts) in enumerate(slices):
+        num_rows = round(rows_per_cell * _cells(years, regions_districts))
+        slice_seed = seed if mode == "counter" else _slice_seed(seed, run_index, index)
+        streams.append(module.iter_chunks(num_rows, chunk_size, next_id, seed=slice_seed, mode=mode,
+                                          years=years, regions_districts=regions_districts))
+        next_id += num_rows
+    chunks = itertools.chain.from_iterable(streams)
+    if fmt == "parquet":
+        total = write_parquet(chunks, output, prefix=_run_prefix(run_index))
+    else:
+        total = write_csv(chunks, output, append=True)
+
+    years = sorted(set(meta["years"]).union(*(slice_years for slice_years, _ in slices)))
+    pairs = {(region, name) for region, names in meta["regions_districts"].items() for name in names}
+    pairs |= {(region, name) for _, catalog in slices for region, names in catalog.items() for name in names}
+    meta.update(_coverage(meta["rows"] + total, meta["max_record_id"] + total, years, pairs))
+    meta.update(_size_fields(output, fmt))
+    meta["runs"].append({
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "first_id": first_id,
+        "rows": total,
+        "seed": seed,
+        "mode": mode,
+        "slices": [{"years": years, "regions_districts": catalog} for years, catalog in slices],
+    })
+    save_metadata(output, meta)
+    return total
+
+
+def _district_arg(value):
+    region, sep, district = value.partition("=")
+    if not sep or not region or not district:
+        raise argparse.ArgumentTypeError(f"expected REGION=DISTRICT, got {value!r}")
+    return region, district
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new years or districts to a sector dataset.")
+    parser.add_argument("sector", choices=list(SECTORS))
+    parser.add_argument("--format", choices=INCREMENTAL_FORMATS, default="csv")
+    parser.add_argument("--output", default=None, help="existing output (default: the sector's default path)")
+    parser.add_argument("--add-years", nargs="+", type=int, default=[], metavar="YEAR")
+    parser.add_argument("--add-district", nargs="+", type=_district_arg, default=[], metavar="REGION=DISTRICT")
+    parser.add_argument("--seed", type=int, default=42, help="master random seed")
+    parser.add_argument("--mode", choices=INCREMENTAL_MODES, default="batch")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rows-per-cell", type=float, default=None,
+                        help="rows per (year, district) (default: density of the existing output)")
+    args = parser.parse_args()
+
+    output = args.output or with_format_suffix(SECTORS[args.sector][1], args.format)
+    add_districts = {}
+    for region, district in args.add_district:
+        add_districts.setdefault(region, []).append(district)
+    total = extend(args.sector, output, args.format, args.add_years, add_districts, args.seed, args.mode,
+                   args.chunk_size, args.rows_per_cell)
+    if total:
+        print(f"✅ Appended {total:,} rows to {output}")
+    else:
+        print(f"✅ {output} already covers the requested years and districts")
+
+
+if __name__ == "__main__":
+    main()
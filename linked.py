@@ -0,0 +1,269 @@
+"""Linked generation: shared Date/District dimensions, integer foreign keys and join indexes.
+
+    python linked.py --rows 1000000 --output-dir linked
+    python linked.py --rows 1000000 --format npy --compare trade GST_Collection_Cr travel Revenue_Cr
+
+The Date and District dimensions are built once, from the sector modules'
+own catalogs, and written as dim_date.csv and dim_district.csv. Every sector
+is then generated over that same catalog (batch or counter engine). Its
+Date and Region/District strings are replaced by integer Date_ID and
+District_ID keys, so a BI model joins the facts to the dimensions, and the
+facts to each other, on integers.
+
+Alongside each fact table goes <file>.district_year.npz: a CSR join index
+with the fact's row numbers sorted by (District_ID, Year) (`rows`), and the
+start of each district-year's run of rows (`offsets`). The rows of district
+d in year y are rows[offsets[c]:offsets[c + 1]], with c the cell
+(d - 1) * len(years) + (y - first year). Cross-sector questions then come
+down to aligning two [district, year] arrays:
+
+    from linked import compare
+    compare("linked", ("trade", "GST_Collection_Cr"), ("travel", "Revenue_Cr"))
+
+linked.json records the years, the number of districts and the files of
+each sector.
+"""
+import argparse
+import importlib
+import json
+import os
+
+import numpy as np
+
+from common import CHUNK_SIZE, SECTORS
+from dates import SEASONS, get_calendar
+from writers import prepare_output, with_format_suffix, write_csv, write_npy
+
+MANIFEST = "linked.json"
+DATE_DIMENSION = "dim_date.csv"
+DISTRICT_DIMENSION = "dim_district.csv"
+INDEX_SUFFIX = ".district_year.npz"
+
+# Fact layouts that keep rows in generation order, so the index's row numbers stay valid
+# (the Parquet output is partitioned by Year and Region)
+LINKED_FORMATS = ("csv", "npy")
+LINKED_WRITERS = {"csv": write_csv, "npy": write_npy}
+
+# Engines that take the shared catalog as arguments
+LINKED_MODES = ("counter", "batch")
+
+
+def shared_catalog(sectors=SECTORS):
+    """Union of the years and of the region -> districts catalogs of `sectors`, in catalog order."""
+    years, regions_districts = set(), {}
+    for sector in sectors:
+        module = importlib.import_module(SECTORS[sector][0])
+        # Agriculture keeps its catalog as `years` / `districts`
+        years.update(getattr(module, "YEARS", None) or module.years)
+        catalog = getattr(module, "regions_districts", None) or module.districts
+        for region, districts in catalog.items():
+            known = regions_districts.setdefault(region, [])
+            known.extend(district for district in districts if district not in known)
+    return sorted(years), regions_districts
+
+
+def build_dimensions(years, regions_districts):
+    """The Date and District dimension tables (DataFrames keyed by Date_ID and District_ID, from 1)."""
+    import pandas as pd
+
+    calendar = get_calendar(years)
+    dim_date = pd.DataFrame({
+        "Date_ID": np.arange(1, len(calendar.date) + 1, dtype=np.int32),
+        "Date": calendar.date,
+        "Year": calendar.year,
+        "Month": calendar.month,
+        "Season": np.asarray(SEASONS, dtype=object)[calendar.season],
+    })
+    pairs = [(region, district) for region, districts in regions_districts.items() for district in districts]
+    dim_district = pd.DataFrame({
+        "District_ID": np.arange(1, len(pairs) + 1, dtype=np.int32),
+        "Region": [region for region, _ in pairs],
+        "District": [district for _, district in pairs],
+    })
+    return dim_date, dim_district
+
+
+class JoinIndex:
+    """Rows of one fact table grouped by (District_ID, Year), in CSR form."""
+
+    def __init__(self, offsets, rows, years):
+        self.offsets, self.rows = offsets, rows
+        self.years = np.asarray(years)
+
+    @classmethod
+    def build(cls, district_id, year, years, num_districts):
+        """Index rows from their District_ID and Year keys (one entry per fact row, in row order)."""
+        cell = cls._cells(district_id, year, years)
+        counts = np.bincount(cell, minlength=num_districts * len(years))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        rows = np.argsort(cell, kind="stable")
+        return cls(offsets, rows.astype(np.int32 if len(rows) < 2 ** 31 else np.int64), years)
+
+    @staticmethod
+    def _cells(district_id, year, years):
+        position = np.searchsorted(years, year)
+        return (np.asarray(district_id, dtype=np.int64) - 1) * len(years) + position
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["offsets"], data["rows"], data["years"])
+
+    def save(self, path):
+        np.savez(path, offsets=self.offsets, rows=self.rows, years=self.years)
+
+    @property
+    def shape(self):
+        return (len(self.offsets) - 1) // len(self.years), len(self.years)
+
+    def rows_for(self, district_id, year):
+        """Row numbers of one district-year."""
+        cell = self._cells(district_id, year, self.years)
+        return self.rows[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def sums(self, values):
+        """[district, year] totals of `values` (one per fact row, in row order)."""
+        ordered = np.asarray(values, dtype=np.float64)[self.rows]
+        starts = self.offsets[:-1]
+        filled = starts < self.offsets[1:]
+        totals = np.zeros(len(starts))
+        totals[filled] = np.add.reduceat(ordered, starts[filled])
+        return totals.reshape(self.shape)
+
+
+def _link_chunks(chunks, dim_date, dim_district, keys):
+    """Replace Date and Region/District in each chunk by Date_ID and District_ID; collect the index keys."""
+    import pandas as pd
+
+    dates = np.asarray(dim_date["Date"], dtype="datetime64[D]")
+    districts = pd.MultiIndex.from_arrays([dim_district["Region"], dim_district["District"]])
+    for df in chunks:
+        date = np.asarray(df["Date"], dtype="datetime64[D]")
+        date_id = np.searchsorted(dates, date)
+        if (date_id >= len(dates)).any() or (dates[np.minimum(date_id, len(dates) - 1)] != date).any():
+            raise ValueError("fact dates outside the Date dimension")
+        district_id = districts.get_indexer(pd.MultiIndex.from_arrays([df["Region"], df["District"]]))
+        if (district_id < 0).any():
+            raise ValueError("fact districts missing from the District dimension")
+        district_id = (district_id + 1).astype(np.int32)
+        keys.append((district_id, df["Year"].to_numpy()))
+
+        columns = {}
+        for name in df.columns:
+            if name == "Date":
+                columns["Date_ID"] = (date_id + 1).astype(np.int32)
+                columns["District_ID"] = district_id
+            elif name not in ("Region", "District"):
+                columns[name] = df[name]
+        yield pd.DataFrame(columns, copy=False)
+
+
+def generate_linked(rows, output_dir, seed=42, mode="counter", fmt="csv", chunk_size=CHUNK_SIZE, years=None):
+    """Generate every sector in `rows` ({sector: row count}) against one set of dimensions.
+
+    Writes the dimensions, one fact table and join index per sector, and
+    linked.json into `output_dir`. Returns the manifest.
+    """
+    if mode not in LINKED_MODES:
+        raise ValueError(f"linked generation needs one of the batch engines {LINKED_MODES}")
+    if fmt not in LINKED_FORMATS:
+        raise ValueError(f"linked facts are written as one of {LINKED_FORMATS}, which keep row order")
+    os.makedirs(output_dir, exist_ok=True)
+    catalog_years, regions_districts = shared_catalog(rows)
+    years = sorted(years) if years is not None else catalog_years
+    dim_date, dim_district = build_dimensions(years, regions_districts)
+    dim_date.to_csv(os.path.join(output_dir, DATE_DIMENSION), index=False)
+    dim_district.to_csv(os.path.join(output_dir, DISTRICT_DIMENSION), index=False)
+
+    manifest = {"years": years, "districts": len(dim_district), "dimensions":
+                {"date": DATE_DIMENSION, "district": DISTRICT_DIMENSION}, "sectors": {}}
+    for sector, num_rows in rows.items():
+        module_name, default_output = SECTORS[sector]
+        module = importlib.import_module(module_name)
+        facts = with_format_suffix(default_output, fmt)
+        prepare_output(os.path.join(output_dir, facts), fmt)
+        chunks = module.iter_chunks(num_rows, chunk_size, seed=seed, mode=mode, years=years,
+                                    regions_districts=regions_districts)
+        keys = []
+        total = LINKED_WRITERS[fmt](_link_chunks(chunks, dim_date, dim_district, keys),
+                                    os.path.join(output_dir, facts))
+        district_id = np.concatenate([district for district, _ in keys])
+        year = np.concatenate([year for _, year in keys])
+        index = JoinIndex.build(district_id, year, years, len(dim_district))
+        index.save(os.path.join(output_dir, facts + INDEX_SUFFIX))
+        manifest["sectors"][sector] = {"facts": facts, "format": fmt, "rows": total,
+                                       "index": facts + INDEX_SUFFIX}
+    with open(os.path.join(output_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(output_dir):
+    with open(os.path.join(output_dir, MANIFEST)) as f:
+        return json.load(f)
+
+
+def load_index(output_dir, sector):
+    """The JoinIndex of `sector` in a linked output."""
+    return JoinIndex.load(os.path.join(output_dir, read_manifest(output_dir)["sectors"][sector]["index"]))
+
+
+def _fact_column(output_dir, entry, column):
+    path = os.path.join(output_dir, entry["facts"])
+    if entry["format"] == "npy":
+        from npy_columns import open_columns
+        return open_columns(path, [column])[column]
+    import pandas as pd
+    return pd.read_csv(path, usecols=[column])[column].to_numpy()
+
+
+def district_year_totals(output_dir, sector, column):
+    """[district, year] totals of `column` of `sector` (rows follow District_ID, columns the years)."""
+    entry = read_manifest(output_dir)["sectors"][sector]
+    return load_index(output_dir, sector).sums(_fact_column(output_dir, entry, column))
+
+
+def compare(output_dir, left, right):
+    """Per district-year totals of two (sector, column) pairs side by side, as a DataFrame."""
+    import pandas as pd
+
+    manifest = read_manifest(output_dir)
+    years = manifest["years"]
+    district_id = np.repeat(np.arange(1, manifest["districts"] + 1), len(years))
+    df = pd.DataFrame({"District_ID": district_id, "Year": np.tile(years, manifest["districts"])})
+    for sector, column in (left, right):
+        df[f"{sector}.{column}"] = np.round(district_year_totals(output_dir, sector, column).ravel(), 2)
+    dim_district = pd.read_csv(os.path.join(output_dir, manifest["dimensions"]["district"]))
+    return dim_district.merge(df, on="District_ID")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the sectors with shared dimensions and join indexes.")
+    parser.add_argument("--sectors", nargs="+", choices=list(SECTORS), default=list(SECTORS))
+    parser.add_argument("--rows", type=int, default=100000, help="rows per sector")
+    parser.add_argument("--output-dir", default="linked")
+    parser.add_argument("--seed", type=int, default=42, help="master random seed")
+    parser.add_argument("--mode", choices=LINKED_MODES, default="counter")
+    parser.add_argument("--format", choices=LINKED_FORMATS, default="csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--years", type=int, nargs=2, default=None, metavar=("FIRST", "LAST"),
+                        help="years of the Date dimension (default: the sectors' own years)")
+    parser.add_argument("--compare", nargs=4, default=None, metavar=("SECTOR", "COLUMN", "SECTOR", "COLUMN"),
+                        help="afterwards, write two columns' district-year totals side by side")
+    args = parser.parse_args()
+
+    years = list(range(args.years[0], args.years[1] + 1)) if args.years else None
+    manifest = generate_linked({sector: args.rows for sector in args.sectors}, args.output_dir, args.seed,
+                               args.mode, args.format, args.chunk_size, years)
+    for sector, entry in manifest["sectors"].items():
+        print(f"✅ {sector}: {entry['rows']:,} rows, index {entry['index']}")
+    print(f"✅ Dimensions: {len(manifest['years'])} years, {manifest['districts']} districts in {args.output_dir}")
+    if args.compare:
+        left, right = tuple(args.compare[:2]), tuple(args.compare[2:])
+        path = os.path.join(args.output_dir, f"{left[0]}_{left[1]}_vs_{right[0]}_{right[1]}.csv")
+        compare(args.output_dir, left, right).to_csv(path, index=False)
+        print("✅ Comparison written to", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Columnar output as one .npy file per column, loadable with np.memmap.
+
+    travel_npy/
+        columns.json        row count, column order, string dictionaries
+        Record_ID.npy       int64
+        Date.npy            datetime64[D]
+        Region.npy          int16 codes into columns.json["dictionaries"]["Region"]
+        ...
+
+Opening a dataset maps the files instead of reading them, so it takes
+milliseconds regardless of size and a job only pages in the columns (and
+the parts of them) it touches:
+
+    from npy_columns import open_columns, read_frame
+    cols = open_columns("travel_npy", ["Year", "Tourist_Footfall"])
+    df = read_frame("travel_npy", ["Region", "Revenue_Cr"])
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from buffers import widen_float32
+import profiling
+
+CODE_DTYPE = np.dtype(np.int16)
+MANIFEST = "columns.json"
+
+# Fixed .npy header size, so the shape can be filled in once the row count is known
+_HEADER_SIZE = 128
+
+
+def _column_dtype(name, col):
+    """Storage dtype for a column, decided from the first chunk (None: dictionary-encoded)."""
+    if name == "Date":
+        return np.dtype("datetime64[D]")
+    if name == "Year":
+        return np.dtype(np.int16)
+    if name == "Record_ID":
+        return np.dtype(np.int64)
+    if pd.api.types.is_integer_dtype(col):
+        return np.dtype(np.int32)
+    if pd.api.types.is_float_dtype(col):
+        return np.dtype(np.float64)
+    return None
+
+
+def _header(dtype, rows):
+    """A version 1.0 .npy header for a 1-D array, padded to exactly _HEADER_SIZE bytes."""
+    descr = np.lib.format.dtype_to_descr(dtype)
+    text = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, rows)
+    prefix = np.lib.format.magic(1, 0)
+    body_size = _HEADER_SIZE - len(prefix) - 2
+    return prefix + body_size.to_bytes(2, "little") + text.ljust(body_size - 1).encode("latin1") + b"\n"
+
+
+class _ColumnFile:
+    """One .npy file appended to chunk by chunk; the header is rewritten on close."""
+
+    def __init__(self, path, dtype):
+        self.dtype = dtype
+        self.rows = 0
+        self.file = open(path, "wb")
+        self.file.write(_header(dtype, 0))
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self.file.write(values.tobytes())
+        self.rows += len(values)
+        return values.nbytes
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(_header(self.dtype, self.rows))
+        self.file.close()
+
+
+def _encode(values, dictionary):
+    """Codes of `values` in `dictionary` (value -> code), adding unseen values."""
+    inverse, uniques = pd.factorize(np.asarray(values, dtype=object))
+    for value in uniques:
+        dictionary.setdefault(str(value), len(dictionary))
+    if len(dictionary) > np.iinfo(CODE_DTYPE).max:
+        raise ValueError(f"more than {np.iinfo(CODE_DTYPE).max} distinct values in a string column")
+    lookup = np.array([dictionary[str(value)] for value in uniques], dtype=CODE_DTYPE)
+    return lookup[inverse]
+
+
+def _write_manifest(path, rows, columns, dictionaries):
+    manifest = {
+        "rows": rows,
+        "columns": columns,
+        "dictionaries": {name: list(values) for name, values in dictionaries.items()},
+    }
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def write_npy(chunks, path):
+    """Write chunks as a directory of per-column .npy files plus columns.json.
+
+    Columns are appended chunk by chunk, so memory stays at one chunk. String
+    columns are stored as int16 codes; their dictionaries go to columns.json.
+    Returns the row count.
+    """
+    os.makedirs(path, exist_ok=True)
+    files, dictionaries, columns, total = {}, {}, [], 0
+    try:
+        for df in chunks:
+            if not files:
+                columns = list(df.columns)
+                for name in columns:
+                    dtype = _column_dtype(name, df[name])
+                    if dtype is None:
+                        dictionaries[name] = {}
+                    files[name] = _ColumnFile(os.path.join(path, f"{name}.npy"), dtype or CODE_DTYPE)
+            clock, nbytes = profiling.clock("write", len(df)), 0
+            for name in columns:
+                col = df[name]
+                if name in dictionaries:
+                    nbytes += files[name].append(_encode(col.to_numpy(), dictionaries[name]))
+                elif name == "Date":
+                    nbytes += files[name].append(pd.to_datetime(col).to_numpy().astype("datetime64[D]"))
+                elif col.dtype == np.float32:
+                    # Loop-engine buffers: store the decimals they print as, in the batch engines' float64
+                    nbytes += files[name].append(widen_float32(col.to_numpy()))
+                else:
+                    nbytes += files[name].append(col.to_numpy())
+            clock.lap("npy", nbytes=nbytes)
+            total += len(df)
+    finally:
+        for column_file in files.values():
+            column_file.close()
+    _write_manifest(path, total, columns, dictionaries)
+    return total
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        return json.load(f)
+
+
+def open_columns(path, columns=None):
+    """Memory-map the requested columns (default: all) without reading them.
+
+    Returns {name: read-only array}; string columns are their int16 codes
+    (decode with read_manifest(path)["dictionaries"][name]).
+    """
+    names = columns or read_manifest(path)["columns"]
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+
+
+def read_frame(path, columns=None):
+    """The requested columns as a DataFrame; string columns become categoricals over their codes."""
+    manifest = read_manifest(path)
+    data = {}
+    for name, values in open_columns(path, columns).items():
+        if name in manifest["dictionaries"]:
+            data[name] = pd.Categorical.from_codes(values, manifest["dictionaries"][name])
+        else:
+            data[name] = values
+    return pd.DataFrame(data)
+
+
+def concatenate_npy(parts, output):
+    """Join npy datasets (e.g. shards, in Record_ID order) into `output`, re-coding string columns."""
+    parts = [part for part in parts if os.path.exists(os.path.join(part, MANIFEST))]
+    manifests = [read_manifest(part) for part in parts]
+    if not parts:
+        return 0
+    os.makedirs(output, exist_ok=True)
+    columns = manifests[0]["columns"]
+    dictionaries = {name: {} for name in manifests[0]["dictionaries"]}
+    for name in columns:
+        dtype = np.load(os.path.join(parts[0], f"{name}.npy"), mmap_mode="r").dtype
+        out = _ColumnFile(os.path.join(output, f"{name}.npy"), dtype)
+        try:
+            for part, manifest in zip(parts, manifests):
+                values = np.load(os.path.join(part, f"{name}.npy"), mmap_mode="r")
+                if name in dictionaries:
+                    recode = _encode(manifest["dictionaries"][name], dictionaries[name])
+                    values = recode[values]
+                out.append(values)
+        finally:
+            out.close()
+    total = sum(manifest["rows"] for manifest in manifests)
+    _write_manifest(output, total, columns, dictionaries)
+    return total
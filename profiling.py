@@ -0,0 +1,158 @@
+"""Opt-in stage timing for generation runs.
+
+    python Travel.py --rows 10000000 --mode batch --profile travel_profile.json
+    python Travel.py --rows 200000 --profile travel_profile.json --cprofile travel.prof
+
+While enabled, the engines and writers record the wall time, rows and bytes
+of each stage under a dotted name:
+
+    batch.sample    calendar, location and category draws
+    batch.derive    derived measures (revenue rules, hotels, employment, ...)
+    batch.frame     building the chunk's DataFrame
+    loop.rows       the row-by-row loop (sampling and derived measures together)
+    loop.frame      wrapping the chunk's RecordBuffer arrays in a DataFrame
+    write.*         encoding and writing (csv, csv.encode/csv.write when pipelined, parquet, npy)
+
+The summary is written as JSON. The loop engines interleave sampling and
+derived measures row by row, so for them the cProfile dump (optionally
+summarised in the JSON too) shows the split per function, e.g.
+estimate_hotels vs random.choice. When profiling is off every hook is a
+no-op, so the engines' output and speed are unchanged.
+"""
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+
+# Functions listed in the JSON summary when cProfile is on
+TOP_FUNCTIONS = 25
+
+_lock = threading.Lock()
+_stages = {}
+_enabled = False
+_started = None
+_stopped = None
+_profiler = None
+
+
+def enabled():
+    return _enabled
+
+
+def enable(cprofile=False):
+    """Start recording stages (clearing earlier ones), and run cProfile too if asked."""
+    global _enabled, _started, _stopped, _profiler
+    if _profiler is not None:
+        _profiler.disable()
+    _stages.clear()
+    _enabled = True
+    _started, _stopped = time.perf_counter(), None
+    _profiler = cProfile.Profile() if cprofile else None
+    if _profiler is not None:
+        _profiler.enable()
+
+
+def disable():
+    """Stop recording; the stages recorded so far stay available to summary()."""
+    global _enabled, _stopped
+    if _profiler is not None:
+        _profiler.disable()
+    _enabled = False
+    _stopped = time.perf_counter()
+
+
+def record(name, seconds=0.0, rows=0, nbytes=0):
+    """Add one call of stage `name` (thread-safe; ignored when profiling is off)."""
+    if not _enabled:
+        return
+    with _lock:
+        stage = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        stage["rows"] += rows
+        stage["bytes"] += nbytes
+
+
+class _Clock:
+    def __init__(self, prefix, rows):
+        self.prefix, self.rows = prefix, rows
+        self.last = time.perf_counter()
+
+    def lap(self, name, nbytes=0):
+        """Record the time since the previous lap as stage `<prefix>.<name>`."""
+        now = time.perf_counter()
+        record(f"{self.prefix}.{name}", now - self.last, self.rows, nbytes)
+        self.last = now
+
+
+class _NullClock:
+    def lap(self, name, nbytes=0):
+        pass
+
+
+_NULL_CLOCK = _NullClock()
+
+
+def clock(prefix, rows=0):
+    """Stopwatch whose laps become stages `<prefix>.<lap name>`, each counting `rows` rows.
+
+        clock = profiling.clock("batch", n)
+        ...                       # draws
+        clock.lap("sample")
+    """
+    return _Clock(prefix, rows) if _enabled else _NULL_CLOCK
+
+
+def snapshot():
+    """Copy of the stages recorded so far (e.g. to send from a shard worker to the parent)."""
+    with _lock:
+        return {name: dict(stage) for name, stage in _stages.items()}
+
+
+def merge(stages):
+    """Fold stages from snapshot() of another process into this one."""
+    with _lock:
+        for name, other in stages.items():
+            stage = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+            for key, value in other.items():
+                stage[key] += value
+
+
+def _top_functions(limit=TOP_FUNCTIONS):
+    stats = pstats.Stats(_profiler, stream=io.StringIO()).sort_stats("cumulative")
+    functions = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        functions.append({"function": f"{name} ({filename}:{line})", "calls": calls,
+                          "own_seconds": round(own, 6), "cumulative_seconds": round(cumulative, 6)})
+    functions.sort(key=lambda f: f["cumulative_seconds"], reverse=True)
+    return functions[:limit]
+
+
+def summary():
+    """Wall time and per-stage totals (slowest first), with rows/s, MB/s and share of the wall time."""
+    wall = (_stopped or time.perf_counter()) - _started if _started is not None else 0.0
+    stages = {}
+    for name, stage in sorted(snapshot().items(), key=lambda item: item[1]["seconds"], reverse=True):
+        seconds = stage["seconds"]
+        stages[name] = {
+            **stage,
+            "seconds": round(seconds, 6),
+            "share": round(seconds / wall, 4) if wall else None,
+            "rows_per_sec": round(stage["rows"] / seconds) if seconds and stage["rows"] else None,
+            "mb_per_sec": round(stage["bytes"] / seconds / 1e6, 2) if seconds and stage["bytes"] else None,
+        }
+    report = {"wall_seconds": round(wall, 6), "stages": stages}
+    if _profiler is not None:
+        report["top_functions"] = _top_functions()
+    return report
+
+
+def write(path=None, cprofile_path=None):
+    """Write the JSON summary to `path` and the raw cProfile stats (for pstats/snakeviz) to `cprofile_path`."""
+    if cprofile_path is not None and _profiler is not None:
+        _profiler.dump_stats(cprofile_path)
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(summary(), f, indent=2)
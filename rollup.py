@@ -0,0 +1,116 @@
+"""KPI rollup cubes accumulated while the raw rows are generated.
+
+Dashboards recomputing totals over every raw row on each refresh can load
+the cube instead: one row per Year × Time_Period × Region × District ×
+category, holding the row count plus the sum, min and max of each measure.
+Chunks are folded in as they stream past the writer, so the cube costs no
+second pass, and raw output can be skipped altogether.
+"""
+import numpy as np
+import pandas as pd
+
+import profiling
+from buffers import widen_float32
+
+DIMENSIONS = ["Year", "Time_Period", "Region", "District"]
+
+# Sector -> (group-by columns, measures); Climate has no Time_Period and groups by Season
+ROLLUPS = {
+    "agriculture": (DIMENSIONS + ["Crop_Type"],
+                    ["Cultivated_Area_HA", "Production_MT", "Export_Tons", "Revenue_Cr",
+                     "Water_Usage_ML", "Fertilizer_Usage_Tons"]),
+    "climate": (["Year", "Region", "District", "Season"],
+                ["Average_Temperature_C", "Rainfall_mm", "Snowfall_mm", "Humidity_Percent",
+                 "Air_Quality_Index"]),
+    "handicrafts": (DIMENSIONS + ["Industry_Type"],
+                    ["Units_Registered", "Production_Value_Cr", "Export_Value_Cr", "Employment_Generated"]),
+    "trade": (DIMENSIONS + ["Market_Type"],
+              ["Trade_Volume_Cr", "Export_Value_Cr", "Import_Value_Cr", "GST_Collection_Cr",
+               "Employment_in_Trade"]),
+    "travel": (DIMENSIONS + ["Destination_Type"],
+               ["Tourist_Footfall", "Revenue_Cr", "Hotels_Registered", "Employment_Generated"]),
+}
+
+# Ratios of sums added to the finished cube: name -> (numerator, denominator)
+RATIOS = {
+    "agriculture": {"Yield_MT_per_HA": ("Production_MT", "Cultivated_Area_HA")},
+}
+
+STATS = ("sum", "min", "max")
+COUNT_COLUMN = "Row_Count"
+
+
+def rollup_path(output):
+    """Default cube path next to a raw output: travel.csv -> travel_rollup.csv."""
+    return output.rstrip("/\\").rsplit(".", 1)[0] + "_rollup.csv"
+
+
+class RollupAccumulator:
+    """Running count/sum/min/max of `measures` grouped by `keys`.
+
+    Partial cubes from separate chunks or shards combine exactly with
+    `merge`, so the result does not depend on how the rows were split.
+    """
+
+    def __init__(self, keys, measures, ratios=None):
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.ratios = dict(ratios or {})
+        self._combine = {f"{m}_{stat}": stat for m in self.measures for stat in STATS}
+        self._combine[COUNT_COLUMN] = "sum"
+        self._state = None
+
+    @classmethod
+    def for_sector(cls, sector):
+        keys, measures = ROLLUPS[sector]
+        return cls(keys, measures, RATIOS.get(sector))
+
+    def _fold(self, partial):
+        if self._state is None:
+            self._state = partial
+        else:
+            combined = pd.concat([self._state, partial])
+            self._state = combined.groupby(level=self.keys, sort=False).agg(self._combine)
+
+    def update(self, df):
+        """Fold one chunk of raw rows into the cube."""
+        clock = profiling.clock("rollup", len(df))
+        # Sum float32 measures (loop engines) as the decimals they print as
+        widened = {m: widen_float32(df[m].to_numpy()) for m in self.measures if df[m].dtype == np.float32}
+        if widened:
+            df = df.assign(**widened)
+        grouped = df.groupby(self.keys, sort=False, observed=True)
+        partial = grouped[self.measures].agg(list(STATS))
+        partial.columns = [f"{m}_{stat}" for m, stat in partial.columns]
+        partial[COUNT_COLUMN] = grouped.size()
+        self._fold(partial)
+        clock.lap("update")
+
+    def merge(self, other):
+        """Fold in another accumulator's cube (e.g. from another shard)."""
+        if other._state is not None:
+            self._fold(other._state)
+
+    def observe(self, chunks):
+        """Pass chunks through unchanged, folding each into the cube on the way."""
+        for df in chunks:
+            self.update(df)
+            yield df
+
+    def result(self):
+        """The cube as a flat DataFrame sorted by the group-by columns."""
+        if self._state is None:
+            return pd.DataFrame(columns=self.keys + [COUNT_COLUMN] + list(self._combine)[:-1])
+        cube = self._state.sort_index().reset_index()
+        cube = cube[self.keys + [COUNT_COLUMN] + [c for c in self._combine if c != COUNT_COLUMN]]
+        sums = [f"{m}_sum" for m in self.measures]
+        cube[sums] = cube[sums].round(4)
+        for name, (numerator, denominator) in self.ratios.items():
+            cube[name] = (cube[f"{numerator}_sum"] / cube[f"{denominator}_sum"]).round(4)
+        return cube
+
+    def write(self, path):
+        """Write the cube as CSV. Returns its row count."""
+        cube = self.result()
+        cube.to_csv(path, index=False)
+        return len(cube)
@@ -0,0 +1,105 @@
+"""Generate all five sector datasets concurrently, one process per sector.
+
+    python run_all.py --rows 1000000 --travel-rows 5000000 --format parquet --output-dir out
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common import CHUNK_SIZE, MODES, SECTORS, non_negative_int, positive_int
+from rollup import rollup_path
+from runner import run_sector
+from writers import COMPRESSIONS, FORMATS, with_format_suffix
+
+
+# Sectors whose batch engines can read weather from the shared climate grid
+GRID_SECTORS = ("agriculture", "climate")
+
+
+def _run(sector, num_rows, output, seed, chunk_size, shards, fmt, mode, climate_grid=None, rollup=False,
+         raw=True, compression=None):
+    module, _ = SECTORS[sector]
+    options = {"climate_grid": climate_grid} if sector in GRID_SECTORS else {}
+    if rollup:
+        options.update(rollup=rollup_path(output), raw=raw)
+    if compression:
+        output += COMPRESSIONS[compression]
+    start = time.perf_counter()
+    total = run_sector(module, num_rows, output, seed, chunk_size, shards, fmt=fmt, mode=mode,
+                       compression=compression, **options)
+    return total, time.perf_counter() - start
+
+
+def run_all(rows, output_dir=".", seed=42, fmt="csv", chunk_size=CHUNK_SIZE, shards=1, mode="loop",
+            climate_grid=None, rollup=False, raw=True, compression=None):
+    """Run every sector in `rows` ({sector: row count}) at the same time.
+
+    With `climate_grid` (a grid seed), Agriculture and Climate share one
+    district×day weather grid, so their weather columns agree. With
+    `rollup`, each sector also writes its KPI cube as <name>_rollup.csv;
+    `raw=False` then skips the raw rows. `compression` (gzip or zstd)
+    compresses the CSV outputs on a background writer thread.
+
+    Returns {sector: (rows written, seconds)} and the total wall time.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(rows)) as pool:
+        futures = {
+            sector: pool.submit(_run, sector, num_rows,
+                                os.path.join(output_dir, with_format_suffix(SECTORS[sector][1], fmt)),
+                                seed, chunk_size, shards, fmt, mode, climate_grid, rollup, raw, compression)
+            for sector, num_rows in rows.items()
+        }
+        results = {sector: future.result() for sector, future in futures.items()}
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate all JKL 360 sector datasets concurrently.")
+    parser.add_argument("--rows", type=non_negative_int, default=100000, help="rows per sector")
+    for sector in SECTORS:
+        parser.add_argument(f"--{sector}-rows", type=non_negative_int, default=None,
+                            help=f"rows for {sector} (default: --rows)")
+    parser.add_argument("--sectors", nargs="+", choices=list(SECTORS), default=list(SECTORS),
+                        help="sectors to generate")
+    parser.add_argument("--seed", type=int, default=42, help="master random seed")
+    parser.add_argument("--output-dir", default=".", help="directory for the generated files")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--mode", choices=MODES, default="loop",
+                        help="row-by-row loop engine, vectorized batch engine, or batch engine on "
+                             "counter-based streams")
+    parser.add_argument("--chunk-size", type=positive_int, default=CHUNK_SIZE)
+    parser.add_argument("--shards", type=positive_int, default=1, help="worker processes per sector")
+    parser.add_argument("--climate-grid", action="store_true",
+                        help="share one district×day weather grid (built from --seed) between "
+                             "agriculture and climate; needs --mode batch or counter")
+    parser.add_argument("--compression", choices=list(COMPRESSIONS), default=None,
+                        help="compress the CSV outputs (e.g. travel.csv.gz)")
+    parser.add_argument("--rollup", action="store_true",
+                        help="also write each sector's KPI rollup cube as <name>_rollup.csv")
+    parser.add_argument("--no-raw", action="store_true", help="with --rollup, skip writing the raw rows")
+    args = parser.parse_args()
+    if args.no_raw and not args.rollup:
+        parser.error("--no-raw needs --rollup")
+    if args.compression and args.format != "csv":
+        parser.error("--compression applies to --format csv only")
+    if args.climate_grid and args.mode == "loop":
+        parser.error("--climate-grid needs --mode batch or counter")
+
+    rows = {sector: args.rows if getattr(args, f"{sector}_rows") is None else getattr(args, f"{sector}_rows")
+            for sector in args.sectors}
+    results, wall = run_all(rows, args.output_dir, args.seed, args.format, args.chunk_size, args.shards,
+                            args.mode, args.seed if args.climate_grid else None, args.rollup, not args.no_raw,
+                            args.compression)
+
+    print(f"{'Sector':<12}{'Rows':>12}{'Seconds':>10}{'Rows/sec':>14}")
+    for sector, (total, seconds) in results.items():
+        print(f"{sector:<12}{total:>12,}{seconds:>10.2f}{total / seconds:>14,.0f}")
+    total_rows = sum(total for total, _ in results.values())
+    print(f"✅ {total_rows:,} rows across {len(results)} sectors in {wall:.2f}s wall time")
+
+
+if __name__ == "__main__":
+    main()
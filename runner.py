@@ -0,0 +1,183 @@
+"""Run a sector generator, optionally sharded across a process pool."""
+import importlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import profiling
+from common import CHUNK_SIZE, SECTORS, chunk_bounds
+from counter_rng import RowStreams
+from writers import WRITERS, open_compressed, prepare_output, write_csv_pipelined, write_parquet
+
+
+def shard_bounds(num_rows, num_shards, start_id=1):
+    """Split a run into `num_shards` contiguous Record_ID ranges."""
+    shard_size = -(-num_rows // num_shards) if num_rows else 1
+    return list(chunk_bounds(num_rows, shard_size, start_id))
+
+
+def shard_seeds(seed, num_shards):
+    """Derive one independent seed per shard from the master seed."""
+    children = np.random.SeedSequence(seed).spawn(num_shards)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _consume(module, chunks, path, fmt, prefix="part", rollup=False, compression=None, pipeline=False):
+    """Write chunks to `path` (None: discard them), folding them into a rollup cube if asked.
+
+    CSV goes through the background writer when `pipeline` is set or the
+    output is compressed.
+
+    Returns (row count, RollupAccumulator or None).
+    """
+    from rollup import RollupAccumulator
+    cube = RollupAccumulator.for_sector(module.SECTOR) if rollup else None
+    if cube is not None:
+        chunks = cube.observe(chunks)
+    if path is None:
+        total = sum(len(df) for df in chunks)
+    elif fmt == "parquet":
+        total = write_parquet(chunks, path, prefix=prefix)
+    elif fmt == "csv" and (compression or pipeline):
+        total = write_csv_pipelined(chunks, path, compression)
+    else:
+        total = WRITERS[fmt](chunks, path)
+    return total, cube
+
+
+def _generate_shard(sector, index, first_id, num_rows, seed, path, chunk_size, fmt, rollup, pipeline,
+                    options):
+    """Run one shard in a worker. Returns (row count, cube, profiling stages recorded by the shard)."""
+    if profiling.enabled():
+        # A forked worker inherits the parent's profiling state; count only this shard's stages
+        profiling.enable()
+    module = importlib.import_module(sector)
+    chunks = module.iter_chunks(num_rows, chunk_size, first_id, seed=seed, **options)
+    total, cube = _consume(module, chunks, path, fmt, f"shard{index:05d}", rollup, pipeline=pipeline)
+    return total, cube, profiling.snapshot() if profiling.enabled() else {}
+
+
+def _concatenate_csv(parts, output, compression=None):
+    """Join shard CSVs in Record_ID order, keeping only the first header (compressing if asked)."""
+    with open_compressed(output, compression) as out:
+        for index, part in enumerate(parts):
+            if not os.path.exists(part):
+                continue
+            with open(part, "rb") as src:
+                if index > 0:
+                    src.readline()
+                shutil.copyfileobj(src, out)
+
+
+def generate_sharded(sector, num_rows, output, num_shards, seed=None, chunk_size=CHUNK_SIZE,
+                     processes=None, fmt="csv", start_id=1, rollup=False, compression=None,
+                     pipeline=False, **options):
+    """Generate `num_rows` rows of `sector` across a process pool.
+
+    Each shard covers a contiguous Record_ID range and gets its own seed
+    derived from `seed`, so the output is identical for a given
+    (seed, num_shards) regardless of scheduling. In counter mode every shard
+    uses `seed` itself, so the output matches a serial run exactly. CSV
+    shards are concatenated (and compressed) into `output`; Parquet shards write straight
+    into the shared dataset directory; with `output` None nothing is
+    written. Returns the row count and, with `rollup`, the merged cube.
+    Profiling stages recorded in the workers are merged into this process.
+    """
+    bounds = shard_bounds(num_rows, num_shards, start_id)
+    if options.get("mode") == "counter":
+        seeds = [seed] * len(bounds)
+    else:
+        seeds = shard_seeds(seed, len(bounds))
+    # Shard parts sit next to the output (same filesystem); without one, in the system temp directory
+    work_dir = tempfile.mkdtemp(prefix=".shards-", dir=os.path.dirname(os.path.abspath(output)) if output else None)
+    if output is None:
+        parts = [None] * len(bounds)
+    elif fmt == "parquet":
+        parts = [output] * len(bounds)
+    else:
+        parts = [os.path.join(work_dir, f"part-{index:05d}.{fmt}") for index in range(len(bounds))]
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_generate_shard, sector, index, first_id, n, shard_seed, part,
+                            chunk_size, fmt, rollup, pipeline, options)
+                for index, ((first_id, n), shard_seed, part) in enumerate(zip(bounds, seeds, parts))
+            ]
+            results = [future.result() for future in futures]
+        for _, _, stages in results:
+            profiling.merge(stages)
+        clock = profiling.clock("shards", num_rows)
+        if fmt == "csv" and output is not None:
+            _concatenate_csv(parts, output, compression)
+            clock.lap("concatenate")
+        elif fmt == "npy" and output is not None:
+            from npy_columns import concatenate_npy
+            concatenate_npy(parts, output)
+            clock.lap("concatenate")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total = sum(rows for rows, _, _ in results)
+    cube = None
+    if rollup:
+        cube = results[0][1]
+        for _, shard_cube, _ in results[1:]:
+            cube.merge(shard_cube)
+    return total, cube
+
+
+def run_sector(sector, num_rows, output, seed=None, chunk_size=CHUNK_SIZE, shards=1,
+               processes=None, fmt="csv", start_id=1, rollup=None, raw=True, compression=None,
+               pipeline=False, profile=None, cprofile=None, **options):
+    """Generate one sector dataset into `output`. Returns the row count.
+
+    With `rollup` (a path), the KPI rollup cube is accumulated in the same
+    pass and written there as CSV; `raw=False` then skips the raw rows.
+    CSV output can be gzip/zstd-compressed, and with `pipeline` (implied by
+    `compression`) it is written on a background thread while generation
+    continues.
+
+    With `profile` and/or `cprofile` (paths), the run is profiled: the
+    per-stage JSON summary goes to `profile` and the cProfile stats of this
+    process to `cprofile` (see profiling.py).
+    """
+    if profile is not None or cprofile is not None:
+        profiling.enable(cprofile=cprofile is not None)
+        try:
+            return run_sector(sector, num_rows, output, seed, chunk_size, shards, processes, fmt, start_id,
+                              rollup, raw, compression, pipeline, **options)
+        finally:
+            profiling.disable()
+            profiling.write(profile, cprofile)
+    if compression is not None and fmt != "csv":
+        raise ValueError("compression applies to CSV output only")
+    if not raw and rollup is None:
+        raise ValueError("skipping the raw rows only makes sense with a rollup output")
+    output = output if raw else None
+    if output is not None:
+        prepare_output(output, fmt)
+    if shards > 1 and num_rows:
+        total, cube = generate_sharded(sector, num_rows, output, shards, seed, chunk_size, processes,
+                                       fmt, start_id, rollup=rollup is not None, compression=compression,
+                                       pipeline=pipeline, **options)
+    else:
+        module = importlib.import_module(sector)
+        chunks = module.iter_chunks(num_rows, chunk_size, start_id, seed=seed, **options)
+        total, cube = _consume(module, chunks, output, fmt, rollup=rollup is not None,
+                               compression=compression, pipeline=pipeline)
+    if cube is not None:
+        cube.write(rollup)
+    return total
+
+
+def generate_rows(sector, first_id, num_rows, seed):
+    """Regenerate Record_IDs first_id..first_id+num_rows-1 of a counter-mode run.
+
+    Only those rows are computed, so spot-checking row 37,412,009 of a 50M-row
+    dataset costs the same as generating row 1.
+    """
+    module = importlib.import_module(SECTORS[sector][0])
+    return module.generate_batch(num_rows, RowStreams(seed, sector, first_id, num_rows), first_id)
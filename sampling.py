@@ -0,0 +1,112 @@
+"""Vectorized weighted-categorical sampling shared by the batch engines.
+
+`np.random.choice(values, p=...)` rebuilds and validates its probability
+vector on every call, and `random.choice(list(d.keys()))` rebuilds a list
+per row. The samplers here are built once per table and then draw any
+number of codes in one call.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+class AliasTable:
+    """Walker/Vose alias table for O(1) categorical draws.
+
+    `weights` is either one distribution (1-D) or one distribution per
+    condition (2-D, one row per condition, e.g. per region). Rows may be
+    zero-padded to a common width; zero-weight categories are never drawn.
+    Every call to `sample` consumes exactly two `rng.random(size)` arrays.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=float)
+        table = np.atleast_2d(weights)
+        n_conditions, n_categories = table.shape
+        self.n_categories = n_categories
+        self.prob = np.ones((n_conditions, n_categories))
+        self.alias = np.tile(np.arange(n_categories), (n_conditions, 1))
+        for row in range(n_conditions):
+            self._build(row, table[row] / table[row].sum() * n_categories)
+
+    def _build(self, row, scaled):
+        small = [k for k, p in enumerate(scaled) if p < 1.0]
+        large = [k for k, p in enumerate(scaled) if p >= 1.0]
+        scaled = scaled.copy()
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self.prob[row, s] = scaled[s]
+            self.alias[row, s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # Leftovers are 1.0 up to rounding error
+        for k in small + large:
+            self.prob[row, k] = 1.0
+
+    def sample(self, rng, size, given=None):
+        """Draw `size` category indices, optionally conditioned on row codes `given`."""
+        condition = 0 if given is None else given
+        column = np.minimum((rng.random(size) * self.n_categories).astype(np.intp), self.n_categories - 1)
+        accept = rng.random(size) < self.prob[condition, column]
+        return np.where(accept, column, self.alias[condition, column])
+
+
+def uniform_table(n_categories):
+    """Alias table for an unweighted choice among `n_categories` values."""
+    return AliasTable(np.ones(n_categories))
+
+
+class GroupedChoice:
+    """Uniform choice of a member within each row's group, e.g. a district within its region.
+
+    `groups` maps group name -> member list. Members are numbered in one flat
+    list (`values`), so samples are directly usable as codes into it.
+    """
+
+    def __init__(self, groups):
+        self.groups = list(groups)
+        self.values = [member for members in groups.values() for member in members]
+        sizes = [len(members) for members in groups.values()]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+        width = max(sizes)
+        weights = np.array([[1.0] * size + [0.0] * (width - size) for size in sizes])
+        self.table = AliasTable(weights)
+
+    def sample(self, rng, group_codes):
+        """Draw one flat member code for each entry of `group_codes`."""
+        return self.offsets[group_codes] + self.table.sample(rng, len(group_codes), given=group_codes)
+
+
+class LocationChoice:
+    """Uniform region, then a uniform district within it, as every sector draws locations.
+
+    `regions_districts` may cover only some of `all_regions` (e.g. just the
+    districts added in an incremental run); region codes are still returned
+    as positions in `all_regions`, so per-region lookup tables keep working.
+    District codes index `values`.
+    """
+
+    def __init__(self, regions_districts, all_regions):
+        unknown = [region for region in regions_districts if region not in all_regions]
+        if unknown:
+            raise ValueError(f"unknown region(s) {unknown}; expected a subset of {list(all_regions)}")
+        self.region_codes = np.array([list(all_regions).index(r) for r in regions_districts], dtype=np.intp)
+        self.regions = uniform_table(len(self.region_codes))
+        self.districts = GroupedChoice(regions_districts)
+        self.values = self.districts.values
+
+    def sample(self, rng, size):
+        """Draw (region codes into `all_regions`, district codes into `values`)."""
+        local = self.regions.sample(rng, size)
+        return self.region_codes[local], self.districts.sample(rng, local)
+
+
+@lru_cache(maxsize=None)
+def _location_choice(groups, all_regions):
+    return LocationChoice({region: list(members) for region, members in groups}, all_regions)
+
+
+def location_choice(regions_districts, all_regions):
+    """Shared, cached LocationChoice for a region -> districts mapping."""
+    groups = tuple((region, tuple(members)) for region, members in regions_districts.items())
+    return _location_choice(groups, tuple(all_regions))
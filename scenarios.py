@@ -0,0 +1,196 @@
+"""What-if sweeps: one output per parameter variant, all from one set of random draws.
+
+    python scenarios.py climate --vary warming_per_year 0.05 0.1 0.2 --rows 1000000
+    python scenarios.py trade --vary trade_growth_per_year 0.02 0.03 0.05 --format parquet
+    python scenarios.py travel --scenarios sweep.json    # {"name": {"footfall_growth_per_year": 0.06}, ...}
+
+Each chunk's random base (the uniforms and normals behind dates, regions,
+districts, categories and measures) is drawn once. It is then replayed
+through the batch engine once per scenario with that scenario's keyword
+parameters (SCENARIO_PARAMETERS below), so a variant only costs its
+vectorized arithmetic and its writing, not a fresh run. Every scenario sees
+the same rows: differences between outputs come from the parameters alone.
+In counter mode (the default) the scenario with default parameters is
+identical to a plain --mode counter run.
+
+Output goes to <output-dir>/<scenario>/<sector file>.
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+from common import CHUNK_SIZE, SECTORS, chunk_bounds
+from counter_rng import RowStreams
+from writers import prepare_output, with_format_suffix, write_csv, write_parquet
+
+# generate_batch keyword arguments a scenario may set, per sector
+SCENARIO_PARAMETERS = {
+    "agriculture": ("ladakh_rain_range",),
+    "climate": ("warming_per_year", "temperature_range"),
+    "handicrafts": ("units_range",),
+    "trade": ("trade_growth_per_year",),
+    "travel": ("footfall_growth_per_year",),
+}
+
+SWEEP_MODES = ("counter", "batch")
+SWEEP_FORMATS = ("csv", "parquet")
+
+
+class SharedDraws:
+    """Stand-in for the `np.random.Generator` methods used by the batch engines, replayable.
+
+    The first pass draws standard uniforms and normals from `rng` (a
+    Generator or RowStreams) and records them; after `rewind()` the same
+    calls get the recorded values back, transformed with the new call's
+    arguments. uniform, integers and normal are derived from the base draws
+    as RowStreams derives them.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self._draws = []
+        self._position = 0
+
+    def rewind(self):
+        """Start the next pass from the first recorded draw."""
+        self._position = 0
+
+    def _base(self, kind, size):
+        shape = tuple(np.atleast_1d(size)) if size is not None else ()
+        if self._position < len(self._draws):
+            recorded_kind, values = self._draws[self._position]
+            if recorded_kind != kind or values.shape != shape:
+                raise ValueError(f"draw {self._position} is a {kind} of shape {shape}, but the first pass "
+                                 f"drew a {recorded_kind} of shape {values.shape}; scenarios must not "
+                                 "change which columns are drawn")
+        else:
+            values = self.rng.random(size) if kind == "uniform" else self.rng.normal(0.0, 1.0, size)
+            self._draws.append((kind, np.asarray(values)))
+        self._position += 1
+        return values
+
+    @staticmethod
+    def _size(size, *params):
+        return size if size is not None else np.broadcast(*params).shape
+
+    def random(self, size=None):
+        return self._base("uniform", size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        u = self._base("uniform", self._size(size, low, high))
+        return low + (high - low) * u
+
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        u = self._base("uniform", self._size(size, low, high))
+        span = np.asarray(high, dtype=np.int64) - low
+        return low + np.minimum((u * span).astype(np.int64), span - 1)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        z = self._base("normal", self._size(size, loc, scale))
+        return loc + scale * z
+
+
+def scenario_grid(vary):
+    """{name: params} for every combination of `vary` ({parameter: [values]})."""
+    names = list(vary)
+    grid = {}
+    for values in itertools.product(*(vary[name] for name in names)):
+        params = dict(zip(names, values))
+        label = ",".join(f"{name}={json.dumps(value, separators=(',', ':'))}" for name, value in params.items())
+        grid[label] = params
+    return grid
+
+
+def _check_parameters(sector, scenarios):
+    allowed = SCENARIO_PARAMETERS[sector]
+    for name, params in scenarios.items():
+        unknown = sorted(set(params) - set(allowed))
+        if unknown:
+            raise ValueError(f"scenario {name!r}: {sector} has no scenario parameter {', '.join(unknown)} "
+                             f"(choose from {', '.join(allowed)})")
+    # Range tables arrive as nested lists from JSON / the command line
+    return {name: {key: np.asarray(value) if isinstance(value, list) else value
+                   for key, value in params.items()}
+            for name, params in scenarios.items()}
+
+
+def sweep(sector, scenarios, num_rows, output_dir, seed=42, mode="counter", fmt="csv", chunk_size=CHUNK_SIZE,
+          start_id=1):
+    """Write one output of `sector` per scenario ({name: generate_batch kwargs}) under `output_dir`.
+
+    Returns {scenario name: output path}.
+    """
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"scenario sweeps need one of the batch engines {SWEEP_MODES}")
+    if fmt not in SWEEP_FORMATS:
+        raise ValueError(f"scenario sweeps write one of {SWEEP_FORMATS}")
+    module_name, default_output = SECTORS[sector]
+    module = importlib.import_module(module_name)
+    scenarios = _check_parameters(sector, scenarios)
+    paths = {name: os.path.join(output_dir, name, with_format_suffix(default_output, fmt)) for name in scenarios}
+    for path in paths.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        prepare_output(path, fmt)
+
+    # An empty sweep still writes one empty chunk per scenario (a CSV gets its header)
+    bounds = list(chunk_bounds(num_rows, chunk_size, start_id)) if num_rows else [(start_id, 0)]
+    rng = np.random.default_rng(seed)
+    for index, (first_id, n) in enumerate(bounds):
+        base = RowStreams(seed, module.SECTOR, first_id, n) if mode == "counter" else rng
+        draws = SharedDraws(base)
+        for name, params in scenarios.items():
+            draws.rewind()
+            df = module.generate_batch(n, draws, first_id, **params)
+            if fmt == "parquet":
+                write_parquet([df], paths[name], prefix=f"chunk{index:05d}")
+            else:
+                write_csv([df], paths[name], append=index > 0)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate one output per parameter scenario from shared draws.")
+    parser.add_argument("sector", choices=list(SECTORS))
+    parser.add_argument("--vary", nargs="+", action="append", default=[], metavar=("PARAMETER", "VALUE"),
+                        help="a parameter and the values to sweep, as JSON (0.05, [[15,38],[-6,30],[-20,25]]); "
+                             "repeat to sweep the grid of several parameters")
+    parser.add_argument("--scenarios", default=None, metavar="JSON",
+                        help='file with named scenarios: {"name": {"parameter": value, ...}, ...}')
+    parser.add_argument("--baseline", action="store_true",
+                        help="also write a scenario with the default parameters")
+    parser.add_argument("--rows", type=int, default=100000, help="rows per scenario")
+    parser.add_argument("--output-dir", default="scenarios")
+    parser.add_argument("--seed", type=int, default=42, help="master random seed")
+    parser.add_argument("--mode", choices=SWEEP_MODES, default="counter")
+    parser.add_argument("--format", choices=SWEEP_FORMATS, default="csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    scenarios = {"baseline": {}} if args.baseline else {}
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios.update(json.load(f))
+    vary = {}
+    for parameter, *values in args.vary:
+        if not values:
+            parser.error(f"--vary {parameter} needs at least one value")
+        vary[parameter] = [json.loads(value) for value in values]
+    if vary:
+        scenarios.update(scenario_grid(vary))
+    if not scenarios:
+        parser.error("give --vary, --scenarios or --baseline")
+
+    paths = sweep(args.sector, scenarios, args.rows, args.output_dir, args.seed, args.mode, args.format,
+                  args.chunk_size)
+    for name, path in paths.items():
+        print(f"✅ {name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
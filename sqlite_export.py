@@ -0,0 +1,186 @@
+"""Bulk-load sector datasets into one indexed SQLite database.
+
+    python sqlite_export.py --rows 1000000 --mode batch --output jkl360.db
+    python sqlite_export.py --from-dir data --output jkl360.db
+
+Each sector becomes a fact table keyed by Record_ID whose Region/District
+pair is replaced by a District_ID into the shared `dim_district` table. A
+`<sector>_v` view joins the names back. Rows go in one transaction per
+chunk, and the indexes are built once the table is loaded: Year,
+(District_ID, Year) and (category, District_ID, Year) for each of the
+sector's category columns, plus Region and District on dim_district. A
+filtered query like
+
+    SELECT Year, SUM(Revenue_Cr) FROM agriculture_v
+    WHERE Region = 'Kashmir' AND Crop_Type = 'Saffron' GROUP BY Year
+
+then runs as index searches instead of scanning the whole CSV.
+"""
+import argparse
+import importlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from buffers import widen_float32
+from common import CHUNK_SIZE, MODES, SECTORS
+
+# Category columns indexed (with District_ID, Year) in each sector table
+CATEGORY_COLUMNS = {
+    "agriculture": ["Crop_Type", "Season"],
+    "climate": ["Season", "Extreme_Weather"],
+    "handicrafts": ["Industry_Type", "Handicraft_Item"],
+    "trade": ["Market_Type", "Major_Commodity"],
+    "travel": ["Destination_Type", "Tourist_Type", "Season"],
+}
+
+DIMENSION_DDL = """
+CREATE TABLE IF NOT EXISTS dim_district (
+    District_ID INTEGER PRIMARY KEY,
+    Region TEXT NOT NULL,
+    District TEXT NOT NULL,
+    UNIQUE (Region, District)
+)"""
+
+
+def _sql_type(series):
+    if pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+
+def _column_values(series):
+    """Python values of a column; float32 measures become the decimals they print as."""
+    if series.dtype == np.float32:
+        return widen_float32(series.to_numpy()).tolist()
+    return series.tolist()
+
+
+def connect(path):
+    """Open `path` tuned for bulk loading (the data can always be regenerated)."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(DIMENSION_DDL)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dim_district_district ON dim_district (District)")
+    return conn
+
+
+def district_ids(conn, pairs):
+    """District_IDs for (Region, District) pairs, adding any new ones to dim_district."""
+    conn.executemany("INSERT OR IGNORE INTO dim_district (Region, District) VALUES (?, ?)", pairs)
+    rows = conn.execute("SELECT District_ID, Region, District FROM dim_district")
+    return {(region, district): district_id for district_id, region, district in rows}
+
+
+def _create_table(conn, sector, df):
+    """(Re)create the fact table and its view for chunks shaped like `df`; returns its columns."""
+    columns = []
+    for name in df.columns:
+        if name not in ("Region", "District"):
+            columns.append(name)
+        if name == "Date":
+            columns.append("District_ID")
+    definitions = []
+    for name in columns:
+        if name == "Record_ID":
+            definitions.append("Record_ID INTEGER PRIMARY KEY")
+        elif name == "Date":
+            definitions.append("Date TEXT NOT NULL")
+        elif name == "District_ID":
+            definitions.append("District_ID INTEGER NOT NULL REFERENCES dim_district (District_ID)")
+        else:
+            definitions.append(f"{name} {_sql_type(df[name])}")
+    conn.execute(f"DROP VIEW IF EXISTS {sector}_v")
+    conn.execute(f"DROP TABLE IF EXISTS {sector}")
+    conn.execute(f"CREATE TABLE {sector} ({', '.join(definitions)})")
+
+    selected = [f"d.{name}" if name in ("Region", "District") else f"f.{name}" for name in df.columns]
+    conn.execute(f"CREATE VIEW {sector}_v AS SELECT {', '.join(selected)} "
+                 f"FROM {sector} f JOIN dim_district d ON d.District_ID = f.District_ID")
+    return columns
+
+
+def _create_indexes(conn, sector):
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{sector}_year ON {sector} (Year)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{sector}_district ON {sector} (District_ID, Year)")
+    for name in CATEGORY_COLUMNS.get(sector, []):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{sector}_{name.lower()} "
+                     f"ON {sector} ({name}, District_ID, Year)")
+    conn.execute("ANALYZE")
+
+
+def write_sqlite(chunks, path, sector):
+    """Replace table `sector` in the database at `path` with the rows of `chunks`.
+
+    Every chunk is inserted in its own transaction; indexes are created
+    after the last one. Returns the row count.
+    """
+    conn = connect(path)
+    try:
+        total, columns, insert = 0, None, None
+        for df in chunks:
+            if columns is None:
+                with conn:
+                    columns = _create_table(conn, sector, df)
+                placeholders = ", ".join("?" * len(columns))
+                insert = f"INSERT INTO {sector} ({', '.join(columns)}) VALUES ({placeholders})"
+            with conn:
+                ids = district_ids(conn, set(zip(df["Region"], df["District"])))
+                values = {name: _column_values(df[name]) for name in df.columns
+                          if name not in ("Region", "District")}
+                values["Date"] = pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d").tolist()
+                values["District_ID"] = [ids[pair] for pair in zip(df["Region"], df["District"])]
+                conn.executemany(insert, zip(*(values[name] for name in columns)))
+            total += len(df)
+        if columns is not None:
+            with conn:
+                _create_indexes(conn, sector)
+    finally:
+        conn.close()
+    return total
+
+
+def export(path, rows, seed=42, mode="batch", chunk_size=CHUNK_SIZE, from_dir=None):
+    """Load each sector in `rows` ({sector: row count}) into the database at `path`.
+
+    With `from_dir`, existing CSV outputs in that directory are loaded
+    instead of generating new rows. Returns {sector: rows loaded}.
+    """
+    loaded = {}
+    for sector, num_rows in rows.items():
+        module_name, default_output = SECTORS[sector]
+        if from_dir is not None:
+            chunks = pd.read_csv(os.path.join(from_dir, default_output), chunksize=chunk_size)
+        else:
+            module = importlib.import_module(module_name)
+            chunks = module.iter_chunks(num_rows, chunk_size, seed=seed, mode=mode)
+        loaded[sector] = write_sqlite(chunks, path, sector)
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the JKL 360 sector datasets into SQLite.")
+    parser.add_argument("--output", default="jkl360.db", help="SQLite database file")
+    parser.add_argument("--sectors", nargs="+", choices=list(SECTORS), default=list(SECTORS))
+    parser.add_argument("--rows", type=int, default=100000, help="rows per sector")
+    parser.add_argument("--seed", type=int, default=42, help="master random seed")
+    parser.add_argument("--mode", choices=MODES, default="batch")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per insert transaction")
+    parser.add_argument("--from-dir", default=None,
+                        help="load the existing CSV outputs in this directory instead of generating")
+    args = parser.parse_args()
+
+    loaded = export(args.output, {sector: args.rows for sector in args.sectors}, args.seed, args.mode,
+                    args.chunk_size, args.from_dir)
+    for sector, total in loaded.items():
+        print(f"✅ {sector}: {total:,} rows")
+    print("✅ SQLite database written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from runner import generate_rows, run_sector
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("sector", ["Trade", "Climate"])
+def test_counter_output_independent_of_chunks_and_shards(tmp_path, sector):
+    serial = tmp_path / "serial.csv"
+    run_sector(sector, 1500, str(serial), seed=11, chunk_size=1500, mode="counter")
+    for name, chunk_size, shards in [("chunked", 170, 1), ("sharded", 400, 3)]:
+        path = tmp_path / f"{name}.csv"
+        run_sector(sector, 1500, str(path), seed=11, chunk_size=chunk_size, shards=shards, mode="counter")
+        assert _read(path) == _read(serial), name
+
+
+def test_generate_rows_matches_full_run(tmp_path):
+    path = tmp_path / "travel.csv"
+    run_sector("Travel", 1200, str(path), seed=5, chunk_size=500, mode="counter")
+    full = pd.read_csv(path)
+    rows = generate_rows("travel", 734, 25, seed=5)
+    rows_path = tmp_path / "rows.csv"
+    rows.to_csv(rows_path, index=False)
+    expected = full[full["Record_ID"].between(734, 758)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(pd.read_csv(rows_path), expected)
@@ -0,0 +1,66 @@
+import pytest
+
+import Trade
+from incremental import extend
+from runner import run_sector
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _base(tmp_path, name, fmt):
+    output = tmp_path / name
+    run_sector("Trade", 2000, str(output), seed=3, mode="batch", fmt=fmt)
+    return output
+
+
+def _interrupt_after_first_chunk(monkeypatch):
+    iter_chunks = Trade.iter_chunks
+
+    def interrupted(*args, **kwargs):
+        chunks = iter_chunks(*args, **kwargs)
+        yield next(chunks)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(Trade, "iter_chunks", interrupted)
+
+
+def test_repeated_run_is_a_noop_and_keeps_original_bytes(tmp_path):
+    output = _base(tmp_path, "trade.csv", "csv")
+    original = _read(output)
+    appended = extend("trade", str(output), add_years=[2026], chunk_size=50)
+    assert appended > 0
+    extended = _read(output)
+    assert extended.startswith(original)
+    assert extend("trade", str(output), add_years=[2026], chunk_size=50) == 0
+    assert _read(output) == extended
+
+
+def test_interrupted_first_csv_run_resumes(tmp_path, monkeypatch):
+    reference = _base(tmp_path, "reference.csv", "csv")
+    expected = extend("trade", str(reference), add_years=[2026], chunk_size=50)
+
+    output = _base(tmp_path, "trade.csv", "csv")
+    with monkeypatch.context() as patch:
+        _interrupt_after_first_chunk(patch)
+        with pytest.raises(KeyboardInterrupt):
+            extend("trade", str(output), add_years=[2026], chunk_size=50)
+    assert extend("trade", str(output), add_years=[2026], chunk_size=50) == expected
+    assert _read(output) == _read(reference)
+
+
+def test_interrupted_first_parquet_run_resumes(tmp_path, monkeypatch):
+    import pyarrow.dataset as ds
+
+    output = _base(tmp_path, "trade.parquet", "parquet")
+    with monkeypatch.context() as patch:
+        _interrupt_after_first_chunk(patch)
+        with pytest.raises(KeyboardInterrupt):
+            extend("trade", str(output), fmt="parquet", add_years=[2026], chunk_size=50)
+    appended = extend("trade", str(output), fmt="parquet", add_years=[2026], chunk_size=50)
+    assert appended > 50
+    table = ds.dataset(str(output), partitioning="hive").to_table(columns=["Record_ID"])
+    assert table.num_rows == 2000 + appended
+    assert sorted(table.column("Record_ID").to_pylist()) == list(range(1, 2001 + appended))
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollup import COUNT_COLUMN, ROLLUPS
+from runner import run_sector
+
+
+@pytest.mark.parametrize("sector, module, mode, shards", [
+    ("trade", "Trade", "batch", 1),
+    ("travel", "Travel", "loop", 1),
+    ("climate", "Climate", "counter", 3),
+])
+def test_rollup_matches_groupby_of_raw_rows(tmp_path, sector, module, mode, shards):
+    raw, cube_path = tmp_path / "raw.csv", tmp_path / "cube.csv"
+    run_sector(module, 3000, str(raw), seed=9, chunk_size=700, shards=shards, mode=mode, rollup=str(cube_path))
+    keys, measures = ROLLUPS[sector]
+    expected = pd.read_csv(raw).groupby(keys)[measures].agg(["sum", "min", "max"])
+    expected.columns = [f"{measure}_{stat}" for measure, stat in expected.columns]
+    expected[COUNT_COLUMN] = pd.read_csv(raw).groupby(keys).size()
+    cube = pd.read_csv(cube_path).set_index(keys).sort_index()
+    assert cube[COUNT_COLUMN].sum() == 3000
+    for column in expected.columns:
+        np.testing.assert_allclose(cube.loc[expected.index, column], expected[column], rtol=1e-9, err_msg=column)
+
+
+def test_rollup_without_raw_output_shards_in_system_temp(tmp_path, monkeypatch):
+    import tempfile
+
+    mkdtemp, dirs = tempfile.mkdtemp, []
+
+    def recording_mkdtemp(*args, **kwargs):
+        dirs.append(kwargs.get("dir"))
+        return mkdtemp(*args, **kwargs)
+
+    monkeypatch.setattr(tempfile, "mkdtemp", recording_mkdtemp)
+    monkeypatch.chdir(tmp_path)
+    total = run_sector("Trade", 1000, None, seed=2, shards=2, mode="batch", raw=False,
+                       rollup=str(tmp_path / "cube.csv"))
+    assert total == 1000
+    assert dirs == [None]
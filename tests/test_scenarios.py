@@ -0,0 +1,14 @@
+import os
+
+import pandas as pd
+
+from scenarios import sweep
+
+
+def test_empty_sweep_writes_every_scenario(tmp_path):
+    scenarios = {"flat": {"trade_growth_per_year": 0.0}, "fast": {"trade_growth_per_year": 0.1}}
+    for path in sweep("trade", scenarios, 0, str(tmp_path / "csv")).values():
+        df = pd.read_csv(path)
+        assert len(df) == 0 and "Trade_Volume_Cr" in df.columns
+    for path in sweep("trade", scenarios, 0, str(tmp_path / "parquet"), fmt="parquet").values():
+        assert os.path.isdir(path)
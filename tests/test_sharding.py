@@ -0,0 +1,25 @@
+import pytest
+
+from runner import run_sector
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("mode", ["loop", "batch"])
+def test_sharded_output_is_identical_for_same_seed_and_shards(tmp_path, mode):
+    first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+    for path in (first, second):
+        total = run_sector("Trade", 2500, str(path), seed=7, chunk_size=400, shards=3, processes=2, mode=mode)
+        assert total == 2500
+    assert _read(first) == _read(second)
+
+
+def test_sharded_output_has_one_header_and_consecutive_ids(tmp_path):
+    path = tmp_path / "travel.csv"
+    run_sector("Travel", 1000, str(path), seed=3, chunk_size=300, shards=4, mode="batch")
+    lines = _read(path).decode().splitlines()
+    assert lines[0].startswith("Record_ID,")
+    assert [int(line.split(",", 1)[0]) for line in lines[1:]] == list(range(1, 1001))
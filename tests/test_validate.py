@@ -0,0 +1,42 @@
+import json
+import math
+
+import pandas as pd
+import pytest
+
+import Climate
+import validate as validate_module
+from validate import validate
+
+
+def test_dense_climate_rolling_columns_report_nulls_not_nan(tmp_path):
+    path = tmp_path / "climate_daily.csv"
+    chunks = Climate.iter_chunks(0, 5000, seed=42, dense=True, years=[2020, 2021])
+    pd.concat(list(chunks)).to_csv(path, index=False)
+    report = validate("climate", str(path))
+    districts = sum(len(names) for names in Climate.regions_districts.values())
+    assert report["rows"] == districts * (366 + 365)
+    for name, window in [("Rainfall_7d_mm", 7), ("Snowfall_30d_mm", 30), ("Temperature_Anomaly_30d_C", 30)]:
+        stats = report["columns"][name]
+        assert stats["nulls"] == districts * (window - 1)
+        assert stats["count"] == report["rows"] - stats["nulls"]
+        assert all(math.isfinite(value) for value in (stats["mean"], stats["std"], *stats["quantiles"].values()))
+    assert report["columns"]["Rainfall_mm"]["nulls"] == 0
+
+
+def test_region_range_report_is_json_serialisable(tmp_path):
+    import Agriculture
+
+    path = tmp_path / "agriculture.csv"
+    pd.concat(list(Agriculture.iter_chunks(2000, 1000, seed=42, mode="batch"))).to_csv(path, index=False)
+    report = validate("agriculture", str(path))
+    assert all(type(check["passed"]) is bool for check in report["checks"])
+    json.dumps(report)
+
+
+def test_growth_check_gives_a_finite_tolerance_at_zero_growth(monkeypatch):
+    # intercept, slope, their standard errors and covariance of a flat trend
+    monkeypatch.setattr(validate_module, "_trend_fit", lambda groups, base_year: (100.0, 0.0, 0.13, 0.025, -0.003))
+    verdict = validate_module.GrowthCheck("flat", "Value", 0.0, 2015).result()
+    assert verdict["tolerance"] == pytest.approx(validate_module.TOLERANCE_SE * 0.025 / 100)
+    assert verdict["passed"]
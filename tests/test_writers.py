@@ -0,0 +1,60 @@
+import pytest
+
+from runner import run_sector
+from writers import prepare_output
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "npy"])
+def test_prepare_output_refuses_foreign_directory(tmp_path, fmt):
+    (tmp_path / "notes.txt").write_text("keep me")
+    with pytest.raises(ValueError):
+        prepare_output(str(tmp_path), fmt)
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "npy"])
+def test_rerun_replaces_own_dataset(tmp_path, fmt):
+    output = tmp_path / "trade"
+    run_sector("Trade", 300, str(output), seed=1, mode="batch", fmt=fmt)
+    run_sector("Trade", 120, str(output), seed=1, mode="batch", fmt=fmt)
+    if fmt == "npy":
+        from npy_columns import read_manifest
+        assert read_manifest(str(output))["rows"] == 120
+    else:
+        import pyarrow.dataset as ds
+        assert ds.dataset(str(output), partitioning="hive").count_rows() == 120
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_pipelined_csv_matches_write_csv(tmp_path, processes, compression):
+    import gzip
+
+    import Travel
+    from writers import write_csv, write_csv_pipelined
+
+    plain, pipelined = tmp_path / "plain.csv", tmp_path / "pipelined.csv"
+    write_csv(Travel.iter_chunks(900, 200, seed=4, mode="batch"), str(plain))
+    total = write_csv_pipelined(Travel.iter_chunks(900, 200, seed=4, mode="batch"), str(pipelined),
+                                compression, queue_size=1, processes=processes)
+    assert total == 900
+    data = gzip.decompress(pipelined.read_bytes()) if compression else pipelined.read_bytes()
+    assert data == plain.read_bytes()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "npy"])
+def test_loop_and_batch_columnar_outputs_share_float64_schema(tmp_path, fmt):
+    import validate
+
+    frames = {}
+    for mode in ("loop", "batch"):
+        output = tmp_path / f"{mode}_{fmt}"
+        run_sector("Trade", 200, str(output), seed=6, mode=mode, fmt=fmt)
+        frames[mode] = next(validate.iter_output(str(output)))
+    loop, batch = frames["loop"], frames["batch"]
+    assert loop["GST_Collection_Cr"].dtype == batch["GST_Collection_Cr"].dtype == "float64"
+    assert set(loop.columns) == set(batch.columns)
+    for name in loop.columns:
+        assert loop[name].dtype == batch[name].dtype, name
+    # Widened values are the two-decimal amounts, not float32 artefacts like 5116.1201171875
+    assert (loop["GST_Collection_Cr"].round(2) == loop["GST_Collection_Cr"]).all()
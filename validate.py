@@ -0,0 +1,317 @@
+"""Single-pass, constant-memory validation of a generated sector output.
+
+    python validate.py climate climate.csv
+    python validate.py travel travel.parquet --json report.json
+
+The output is streamed chunk by chunk (CSV, compressed CSV, Parquet or npy
+columns), so files larger than RAM are fine. Along the way it keeps
+running mean/variance per numeric column (Welford, merged across chunks
+with Chan's formula), approximate quantiles from a fixed-size bottom-k
+sample, row counts by Region and Year, and the per-year or per-region
+statistics each generator check needs. The checks compare those against
+the generator's configured parameters (warming trend, growth rates,
+regional ranges) within three standard errors.
+"""
+import argparse
+import importlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from common import CHUNK_SIZE, SECTORS
+
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+SAMPLE_SIZE = 20000
+
+# Allowed distance from the configured value, in standard errors
+TOLERANCE_SE = 3.0
+
+SKIP_COLUMNS = ("Record_ID", "Year")
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of values.
+
+    Missing values (NaN, e.g. the warm-up days of a rolling column) are
+    counted as nulls and left out of the moments.
+    """
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = np.inf, -np.inf
+        self.nulls = 0
+
+    def merge(self, count, mean, m2, low, high):
+        """Fold in the moments of another batch (Chan et al. pairwise update)."""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min, self.max = min(self.min, low), max(self.max, high)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            self.nulls += int((~finite).sum())
+            values = values[finite]
+        if len(values):
+            mean = values.mean()
+            self.merge(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.variance / self.count) if self.count else np.inf
+
+    def summary(self):
+        return {"count": self.count, "nulls": self.nulls, "mean": self.mean,
+                "std": float(np.sqrt(self.variance)), "min": float(self.min), "max": float(self.max)}
+
+
+class GroupedStats:
+    """RunningStats of one column for every value of a grouping column."""
+
+    def __init__(self, key, column):
+        self.key, self.column = key, column
+        self.groups = {}
+
+    def update(self, df):
+        grouped = df.groupby(self.key, sort=False)[self.column]
+        moments = grouped.agg(["count", "mean", "min", "max"])
+        moments["m2"] = grouped.var(ddof=0) * moments["count"]
+        for group, row in moments.iterrows():
+            stats = self.groups.setdefault(group, RunningStats())
+            stats.merge(int(row["count"]), row["mean"], row["m2"], row["min"], row["max"])
+
+
+class BottomKSample:
+    """Uniform sample of fixed size: keep the values with the k smallest random priorities.
+
+    Unlike a classic reservoir it works on whole chunks at a time, and its
+    memory does not depend on the number of rows seen.
+    """
+
+    def __init__(self, k=SAMPLE_SIZE, seed=0):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.priorities = np.empty(0)
+        self.values = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        priorities = np.concatenate([self.priorities, self.rng.random(len(values))])
+        values = np.concatenate([self.values, values])
+        if len(values) > self.k:
+            keep = np.argpartition(priorities, self.k)[:self.k]
+            priorities, values = priorities[keep], values[keep]
+        self.priorities, self.values = priorities, values
+
+    def quantiles(self, qs=QUANTILES):
+        if not len(self.values):
+            return {}
+        return {f"p{round(q * 100):02d}": float(v) for q, v in zip(qs, np.quantile(self.values, qs))}
+
+
+def _trend_fit(groups, base_year):
+    """Weighted least squares of group means on (year - base_year): intercept, slope and their SEs."""
+    years = np.array(sorted(groups), dtype=float)
+    means = np.array([groups[y].mean for y in sorted(groups)])
+    weights = np.array([1.0 / max(groups[y].std_error, 1e-12) ** 2 for y in sorted(groups)])
+    x = years - base_year
+    design = np.column_stack([np.ones_like(x), x])
+    covariance = np.linalg.inv(design.T @ (design * weights[:, None]))
+    intercept, slope = covariance @ design.T @ (weights * means)
+    return intercept, slope, np.sqrt(covariance[0, 0]), np.sqrt(covariance[1, 1]), covariance[0, 1]
+
+
+# ----------------------------
+# Checks against generator parameters
+# ----------------------------
+class TrendCheck:
+    """Mean of `column` rises by `per_year` (absolute) every year since `base_year`."""
+
+    def __init__(self, name, column, per_year, base_year):
+        self.name, self.per_year, self.base_year = name, per_year, base_year
+        self.stats = GroupedStats("Year", column)
+
+    def result(self):
+        _, slope, _, se, _ = _trend_fit(self.stats.groups, self.base_year)
+        return _verdict(self.name, self.per_year, slope, se)
+
+
+class GrowthCheck:
+    """Mean of `column` grows by `rate` × its base-year level every year since `base_year`."""
+
+    def __init__(self, name, column, rate, base_year):
+        self.name, self.rate, self.base_year = name, rate, base_year
+        self.stats = GroupedStats("Year", column)
+
+    def result(self):
+        intercept, slope, se_a, se_b, cov = _trend_fit(self.stats.groups, self.base_year)
+        rate = slope / intercept
+        # Delta method for the standard error of slope / intercept (finite at zero growth)
+        se = np.sqrt(se_b ** 2 + rate ** 2 * se_a ** 2 - 2 * rate * cov) / abs(intercept)
+        return _verdict(self.name, self.rate, rate, se)
+
+
+class RegionRangeCheck:
+    """`column` is uniform on each region's (low, high): mean at the midpoint, values inside the range."""
+
+    def __init__(self, name, column, ranges):
+        self.name, self.ranges = name, ranges
+        self.stats = GroupedStats("Region", column)
+
+    def result(self):
+        results = []
+        for region, (low, high) in self.ranges.items():
+            stats = self.stats.groups.get(region)
+            if stats is None:
+                continue
+            verdict = _verdict(f"{self.name} [{region}]", (low + high) / 2, stats.mean, stats.std_error)
+            verdict["passed"] = bool(verdict["passed"] and low <= stats.min and stats.max <= high)
+            verdict["range"] = [low, high]
+            verdict["observed_range"] = [float(stats.min), float(stats.max)]
+            results.append(verdict)
+        return results
+
+
+def _verdict(name, expected, observed, std_error):
+    tolerance = TOLERANCE_SE * std_error
+    return {"check": name, "expected": float(expected), "observed": float(observed),
+            "tolerance": float(tolerance), "passed": bool(abs(observed - expected) <= tolerance)}
+
+
+def sector_checks(sector):
+    """The checks for `sector`, built from the generator module's own parameters."""
+    module = importlib.import_module(SECTORS[sector][0])
+    if sector == "agriculture":
+        return [RegionRangeCheck("Cultivated_Area_HA by region", "Cultivated_Area_HA", module.region_area_range)]
+    if sector == "climate":
+        return [TrendCheck("Average_Temperature_C warming per year", "Average_Temperature_C",
+                           module.WARMING_PER_YEAR, module.BASE_YEAR),
+                RegionRangeCheck("Humidity_Percent by region", "Humidity_Percent",
+                                 dict(zip(module.REGIONS, map(tuple, module.HUMIDITY_RANGE))))]
+    if sector == "handicrafts":
+        return [RegionRangeCheck("Units_Registered by region", "Units_Registered",
+                                 dict(zip(module.REGIONS, map(tuple, module.UNITS_RANGE))))]
+    if sector == "trade":
+        return [GrowthCheck("Trade_Volume_Cr growth per year", "Trade_Volume_Cr",
+                            module.TRADE_GROWTH_PER_YEAR, module.BASE_YEAR)]
+    if sector == "travel":
+        return [GrowthCheck("Tourist_Footfall growth per year", "Tourist_Footfall",
+                            module.FOOTFALL_GROWTH_PER_YEAR, module.BASE_YEAR)]
+    return []
+
+
+# ----------------------------
+# Streaming input
+# ----------------------------
+def iter_output(path, chunk_size=CHUNK_SIZE):
+    """Yield DataFrame chunks of a CSV (optionally compressed), Parquet or npy output."""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, "columns.json")):
+        from npy_columns import open_columns, read_manifest
+        manifest = read_manifest(path)
+        columns = open_columns(path)
+        for start in range(0, manifest["rows"], chunk_size):
+            chunk = {}
+            for name, values in columns.items():
+                part = np.asarray(values[start:start + chunk_size])
+                if name in manifest["dictionaries"]:
+                    part = np.asarray(manifest["dictionaries"][name], dtype=object)[part]
+                chunk[name] = part
+            yield pd.DataFrame(chunk)
+    elif os.path.isdir(path) or path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        # Partition files hold a few hundred rows each; regroup them into chunk-sized tables
+        pending, pending_rows = [], 0
+        for batch in ds.dataset(path, partitioning="hive").to_batches(batch_size=chunk_size):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= chunk_size:
+                yield pa.Table.from_batches(pending).to_pandas()
+                pending, pending_rows = [], 0
+        if pending:
+            yield pa.Table.from_batches(pending).to_pandas()
+    elif path.endswith(".zst"):
+        import zstandard
+        with zstandard.open(path, "rb") as f:
+            yield from pd.read_csv(f, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def validate(sector, path, chunk_size=CHUNK_SIZE):
+    """Stream `path` once and return the validation report (a JSON-serialisable dict)."""
+    checks = sector_checks(sector)
+    columns, samples = {}, {}
+    counts = {"Region": {}, "Year": {}}
+    rows = 0
+    for df in iter_output(path, chunk_size):
+        rows += len(df)
+        for name in df.columns:
+            if name in SKIP_COLUMNS or not pd.api.types.is_numeric_dtype(df[name]):
+                continue
+            columns.setdefault(name, RunningStats()).update(df[name].to_numpy())
+            samples.setdefault(name, BottomKSample(seed=len(samples))).update(df[name].to_numpy())
+        for key, tally in counts.items():
+            for value, n in df[key].astype(str).value_counts().items():
+                tally[value] = tally.get(value, 0) + int(n)
+        for check in checks:
+            check.stats.update(df)
+
+    results = []
+    for check in checks:
+        result = check.result()
+        results.extend(result if isinstance(result, list) else [result])
+    return {
+        "sector": sector,
+        "path": path,
+        "rows": rows,
+        "columns": {name: {**stats.summary(), "quantiles": samples[name].quantiles()}
+                    for name, stats in columns.items()},
+        "counts": {key: dict(sorted(tally.items())) for key, tally in counts.items()},
+        "checks": results,
+        "passed": all(result["passed"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a generated sector output in one streaming pass.")
+    parser.add_argument("sector", choices=list(SECTORS))
+    parser.add_argument("path", nargs="?", default=None, help="output to check (default: the sector's CSV)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--json", default=None, metavar="PATH", help="also write the full report as JSON")
+    args = parser.parse_args()
+
+    report = validate(args.sector, args.path or SECTORS[args.sector][1], args.chunk_size)
+    print(f"{report['sector']}: {report['rows']:,} rows")
+    for name, stats in report["columns"].items():
+        q = stats["quantiles"]
+        print(f"  {name:<26}mean {stats['mean']:>14,.2f}  std {stats['std']:>12,.2f}  "
+              f"p01 {q.get('p01', float('nan')):>12,.2f}  p50 {q.get('p50', float('nan')):>12,.2f}  "
+              f"p99 {q.get('p99', float('nan')):>12,.2f}"
+              + (f"  nulls {stats['nulls']:,}" if stats["nulls"] else ""))
+    for result in report["checks"]:
+        mark = "✅" if result["passed"] else "❌"
+        print(f"{mark} {result['check']}: expected {result['expected']:.4f}, observed {result['observed']:.4f} "
+              f"(± {result['tolerance']:.4f})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if not report["passed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
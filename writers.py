@@ -0,0 +1,231 @@
+"""Output writers that consume an iterable of DataFrame chunks."""
+import gzip
+import os
+import shutil
+import time
+from collections import deque
+from contextlib import ExitStack
+
+import profiling
+
+FORMATS = ("csv", "parquet", "npy")
+# npy output is a directory of per-column .npy files, e.g. travel_npy/
+FORMAT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "npy": "_npy"}
+
+# Compressed CSV output: codec -> file suffix (travel.csv.gz)
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Chunks allowed to wait for the CSV encoder processes before generation blocks
+PIPELINE_DEPTH = 2
+# Encoder processes used by write_csv_pipelined: the cores generation leaves free (0: encode inline)
+PIPELINE_PROCESSES = min(2, (os.cpu_count() or 1) - 1)
+
+# Hive-style partition layout of the Parquet output: Year=2020/Region=Kashmir/
+PARTITION_COLUMNS = ["Year", "Region"]
+
+
+def with_format_suffix(path, fmt):
+    """Swap the extension of `path` for the one used by `fmt`."""
+    return os.path.splitext(path)[0] + FORMAT_SUFFIXES[fmt]
+
+
+def write_csv(chunks, path, append=False):
+    """Append each chunk to `path` as it arrives, writing the header once.
+
+    Only one chunk is held in memory at a time, so peak memory depends on the
+    chunk size rather than on the total number of rows. With `append`, rows
+    go after the existing contents and no header is written. Returns the row
+    count.
+    """
+    total, size = 0, os.path.getsize(path) if append and os.path.exists(path) else 0
+    for df in chunks:
+        clock = profiling.clock("write", len(df))
+        start = total == 0 and not append
+        df.to_csv(path, mode="w" if start else "a", header=start, index=False)
+        new_size = os.path.getsize(path)
+        clock.lap("csv", nbytes=new_size - size)
+        total, size = total + len(df), new_size
+    return total
+
+
+def open_compressed(path, compression=None, mode="wb"):
+    """Binary file object for `path`, compressed with gzip or zstd if asked."""
+    if compression is None:
+        return open(path, mode)
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=6)
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError("zstd output needs zstandard: pip install zstandard") from exc
+    return zstandard.ZstdCompressor(level=3).stream_writer(open(path, mode))
+
+
+def _encode_csv(df, header, compression):
+    """Worker: one chunk as CSV bytes, a complete gzip member when compressing with gzip.
+
+    Returns (bytes, seconds spent).
+    """
+    start = time.perf_counter()
+    data = df.to_csv(index=False, header=header).encode()
+    if compression == "gzip":
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+    return data, time.perf_counter() - start
+
+
+def write_csv_pipelined(chunks, path, compression=None, queue_size=PIPELINE_DEPTH, processes=PIPELINE_PROCESSES):
+    """Like write_csv, but chunks are encoded (and gzip-compressed) in worker processes.
+
+    DataFrame.to_csv holds the GIL, so it runs in a process pool while this
+    process keeps generating the next chunk, and the encoded bytes are
+    written here in chunk order. Each gzip chunk is its own gzip member
+    (a concatenation of members is a valid .gz file); zstd output stays one
+    stream, compressed here, since zstandard releases the GIL while it
+    works. At most `queue_size` chunks wait to be written: when the writer
+    falls behind, generation blocks, which caps memory. With `processes` 0
+    (no spare core) chunks are encoded inline, as write_csv does. Returns
+    the row count.
+    """
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    def encode_inline(fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    pending = deque()
+    total = 0
+    encoded = "gzip" if compression == "gzip" else None
+    with ExitStack() as stack:
+        if processes > 0:
+            submit = stack.enter_context(ProcessPoolExecutor(max_workers=processes)).submit
+        else:
+            submit = encode_inline
+        out = stack.enter_context(open_compressed(path, None if encoded else compression))
+
+        def write_next():
+            future, rows = pending.popleft()
+            data, seconds = future.result()
+            profiling.record("write.csv.encode", seconds, rows, len(data))
+            clock = profiling.clock("write", rows)
+            out.write(data)
+            clock.lap("csv.write", nbytes=len(data))
+
+        for index, df in enumerate(chunks):
+            pending.append((submit(_encode_csv, df, index == 0, encoded), len(df)))
+            total += len(df)
+            while len(pending) > queue_size:
+                write_next()
+        while pending:
+            write_next()
+    return total
+
+
+def to_columnar(df):
+    """Give a chunk compact, typed columns for columnar formats.
+
+    String columns become categoricals (dictionary-encoded on disk), Date
+    becomes a real date, Year a small integer and other integer measures
+    int32. Record_ID keeps 64 bits. Float measures are float64 from either
+    engine: the loop engines' float32 buffers are widened to the decimals
+    they print as, so loop and batch outputs share one schema.
+    """
+    import pandas as pd
+
+    from buffers import widen_float32
+
+    columns = {}
+    for name, col in df.items():
+        if name == "Date":
+            columns[name] = pd.to_datetime(col)
+        elif name == "Year":
+            columns[name] = col.astype("int16")
+        elif name == "Record_ID":
+            columns[name] = col.astype("int64")
+        elif pd.api.types.is_integer_dtype(col):
+            columns[name] = col.astype("int32")
+        elif pd.api.types.is_float_dtype(col):
+            columns[name] = widen_float32(col.to_numpy())
+        else:
+            columns[name] = col.astype("category")
+    return pd.DataFrame(columns)
+
+
+def write_parquet(chunks, path, prefix="part"):
+    """Write chunks as a Parquet dataset partitioned by Year and Region.
+
+    `path` is a directory; each chunk adds one file per partition it touches,
+    named `<prefix>-<chunk>-<n>.parquet` so concurrent shards can share the
+    same dataset by using different prefixes. Returns the row count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from exc
+
+    os.makedirs(path, exist_ok=True)
+    total = 0
+    for index, df in enumerate(chunks):
+        clock = profiling.clock("write", len(df))
+        table = pa.Table.from_pandas(to_columnar(df), preserve_index=False)
+        table = table.set_column(table.schema.get_field_index("Date"), "Date",
+                                 table.column("Date").cast(pa.date32()))
+        clock.lap("parquet.convert", nbytes=table.nbytes)
+        pq.write_to_dataset(
+            table, path,
+            partition_cols=PARTITION_COLUMNS,
+            basename_template=f"{prefix}-{index:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            compression="zstd",
+        )
+        clock.lap("parquet.write")
+        total += len(df)
+    return total
+
+
+def write_npy(chunks, path):
+    """Write chunks as a directory of memory-mappable .npy columns (see npy_columns)."""
+    from npy_columns import write_npy as write_columns
+    return write_columns(chunks, path)
+
+
+WRITERS = {"csv": write_csv, "parquet": write_parquet, "npy": write_npy}
+
+
+def _dataset_entries(path, fmt):
+    """The entries of directory `path` this tool wrote as a `fmt` dataset, or None if it holds anything else."""
+    entries = os.listdir(path)
+    if fmt == "parquet":
+        written = [name for name in entries
+                   if name.startswith(f"{PARTITION_COLUMNS[0]}=") and os.path.isdir(os.path.join(path, name))]
+    else:
+        if "columns.json" not in entries:
+            return None if entries else []
+        written = [name for name in entries if name == "columns.json" or name.endswith(".npy")]
+    return written if len(written) == len(entries) else None
+
+
+def check_output(path, fmt):
+    """Raise ValueError if `path` is a non-empty directory that is not a `fmt` dataset written by this tool."""
+    if fmt in ("parquet", "npy") and os.path.isdir(path) and _dataset_entries(path, fmt) is None:
+        raise ValueError(f"{path} is a directory that does not hold a {fmt} dataset written by this tool; "
+                         "choose another --output or empty it first")
+
+
+def prepare_output(path, fmt):
+    """Clear a previous dataset directory so a new run does not mix with it.
+
+    Only a directory this tool wrote (Hive Year=... partitions, or npy
+    columns with their columns.json) is cleared; any other non-empty
+    directory is refused rather than deleted.
+    """
+    check_output(path, fmt)
+    if fmt not in ("parquet", "npy") or not os.path.isdir(path):
+        return
+    for name in _dataset_entries(path, fmt):
+        entry = os.path.join(path, name)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        else:
+            os.remove(entry)